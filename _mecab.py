@@ -13,15 +13,18 @@ import itertools     # for list flattening
 import re            # for clearing unnecessary attrs (e.g. 불태워/VV/*, 터/NNP/인명)
 
 import sys
+import array
+import collections
+import fnmatch
+import functools
+import heapq
+import os
+import threading
+import time
+import weakref
 
-try:
-    from MeCab import Tagger
-except ImportError:
-    pass
-
-
-
-from konlpy import utils
+# MeCab, konlpy.utils and the modules only for some methods (asyncio, multiprocessing, ...) are imported on first use,
+# so that importing this module is almost free
 
 
 __all__ = ['Mecab']
@@ -39,6 +42,10 @@ attrs = ['tags',        # 품사 태그
 
 regexp = re.compile(".+(?=/[^A-Z])") # a pattern for only morphemes and their POS (e.g. 불태워/VV/* > 불태워/VV)
 
+# translation tables for hangul_unicode_correction() and the coda normalization
+unicode_correction_table = str.maketrans("ㄴㄹㅁㅂᆼ", "ᆫᆯᄆᄇㅇ")     # (타당하 + ㄴ지  vs. 뭐 + 이 +  ᆫ지) ->  ᆫ지    # "ᆼ" -> "ㅇ"
+coda_normalization_table = str.maketrans("ᆫᆯᄆᄇᆼ", "ㄴㄹㅁㅂㅇ")    # converting final consonant characters to ordinary single characters
+
 
 ######################## the original code ##############################
 def parse(result, allattrs=False, join=False):
@@ -121,6 +128,431 @@ def parse_fixed(result, allattrs=False, join=False):
     #             # itertools: flattening the list to a 2-D list: [ (morpheme, POS), (morpheme, POS), ... ]
 
 
+# function for getting a morpheme with its POS from a part of the index expression (same as regexp.search(part).group())
+# e.g. 불태우/VV/* > 불태우/VV
+def search_morpheme(part):
+    i = part.rfind('/')
+    if 0 < i < len(part) - 1 and not 'A' <= part[i + 1] <= 'Z':
+        return part[:i]
+    return regexp.search(part).group()
+
+
+# function for decomposing the index expression of an Inflect token into (morpheme, POS)s (or morpheme/POS)
+# e.g. '좋아하/VV/*+아/EF/*'  >  (('좋아하', 'VV'), ('아', 'EF')). () if the expression has a single morpheme
+def decompose_expression(expr, join=False, coda_normalization=True, nested=False):
+    # nested: If True, keeps only (morpheme, POS) of each part (as split_fixed() does)
+
+    # There is a bug that outputs of mecab-ko-dic are different according to OS, and OS versions. This is a make-shift.
+    if '+' not in expr:
+        return ()
+
+    # unicode error correction, and then the coda normalization (which reverts the correction of ㄴ, ㄹ, ㅁ, ㅂ)
+    mor_info = [search_morpheme(x) for x in expr.translate(coda_normalization_table if coda_normalization else unicode_correction_table).split("+")]
+    if join:
+        return tuple(mor_info)
+    elif nested:
+        return tuple(tuple(x.split('/')[:2]) for x in mor_info)
+    return tuple(tuple(x.split('/')) for x in mor_info)
+
+
+# a bounded table of decomposed index expressions. The expressions of Inflect tokens follow Zipf's law,
+# so a few thousand of them cover most tokens
+class DecompositionCache():
+    """Decompositions of the index expressions of Inflect tokens (see decompose_expression()), by the options of pos().
+
+    New expressions are added until the table is full. warm() adds frequent ones in advance.
+
+    :param maxsize: The maximum number of decompositions (for all the options).
+    """
+
+    DecompositionInfo = collections.namedtuple('DecompositionInfo', ['hits', 'misses', 'size', 'maxsize'])
+
+    def get(self, expr, join=False, coda_normalization=True, nested=False):
+        return self.decomposers[bool(join), bool(coda_normalization), bool(nested)](expr)
+
+    def decomposer(self, join=False, coda_normalization=True, nested=False):
+        """A function decomposing an expression with the options, looking it up in (and adding it to) the table of the options.
+
+        Every lookup goes through such a function. A parser gets one for a sentence and calls it for each Inflect token.
+        """
+
+        return self.decomposers[bool(join), bool(coda_normalization), bool(nested)]
+
+    def make_decomposer(self, table, join, coda_normalization, nested):
+        def decompose(expr):
+            mor_info = table.get(expr)
+            if mor_info is None:
+                return self.add(table, expr, join, coda_normalization, nested)
+            self.hits += 1  # approximate if threads share the cache (not locked, for speed)
+            return mor_info
+
+        return decompose
+
+    def add(self, table, expr, join, coda_normalization, nested):
+        mor_info = decompose_expression(expr, join=join, coda_normalization=coda_normalization, nested=nested)
+        with self.lock:     # keeping the table within maxsize when threads share the cache
+            self.misses += 1
+            if self.size < self.maxsize and expr not in table:
+                table[expr] = mor_info
+                self.size += 1
+        return mor_info
+
+    def warm(self, features, options=None):
+        """Add the decompositions of the most frequent Inflect tokens in advance.
+
+        :param features: Features (e.g. VV+EF,*,F,좋아해,Inflect,VV,EF,좋아하/VV/*+아/EF/*) in the order of frequency,
+            lines of MeCab-ko (e.g. 좋아해\tVV+EF,...) or of a frequency list (e.g. 1234\tVV+EF,...), or the path of a file of them.
+        :param options: (join, coda_normalization, nested)s of the decompositions. The default is all of them.
+        """
+
+        if isinstance(features, str):   # the path of a file
+            with open(features, encoding='utf-8') as f:
+                return self.warm(f.read().splitlines(), options=options)
+
+        if options is None:
+            options = list(itertools.product((False, True), repeat=3))
+        tables = [(self.tables[tuple(option)], option) for option in options]
+        for feature in features:
+            attrs = feature.rsplit('\t', 1)[-1].split(',')
+            if len(attrs) < 8 or not attrs[4].startswith('Inflect'):
+                continue
+            for table, option in tables:
+                if attrs[-1] in table:
+                    continue
+                mor_info = decompose_expression(attrs[-1], *option)
+                with self.lock:
+                    if self.size >= self.maxsize:
+                        return self
+                    if attrs[-1] not in table:
+                        table[attrs[-1]] = mor_info
+                        self.size += 1
+        return self
+
+    def info(self):
+        # hits are approximate if threads share the cache
+        return self.DecompositionInfo(self.hits, self.misses, self.size, self.maxsize)
+
+    def clear(self):
+        with self.lock:
+            # the decompositions for each option: {(join, coda_normalization, nested): {expression: decomposition}}
+            self.tables = {option: dict() for option in itertools.product((False, True), repeat=3)}
+            self.decomposers = {option: self.make_decomposer(table, *option) for option, table in self.tables.items()}
+            self.size = 0
+            self.hits = self.misses = 0
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.clear()
+
+
+# function for getting the (morpheme, POS) list of a sentence in a single pass over the analysed result
+# same as parse_fixed(hangul_unicode_correction(result)) with the optional coda normalization, but handles each line only once
+def iter_parse_fixed(result, join=False, coda_normalization=True, decompositions=None):
+    # result: an analysed result of a sentence (e.g. 이게 뭔지 알아. > 이게\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*\n...\nEOS\n)
+    # decompositions: a DecompositionCache (optional)
+
+    decompose = decompositions.decomposer(join, coda_normalization) if decompositions is not None else None
+
+    for elem in result.splitlines()[:-1]:
+        if not elem:    # troubleshooting an unanalyzable character
+            yield '/SY' if join else ('', 'SY')
+            continue
+
+        s, t = elem.split('\t')
+        attrs = t.split(',')
+        token_pos = attrs[0]
+
+        if attrs[4].startswith("Inflect"):  # If an eojeol is Inflect (e.g. 불태워졌다 != 불태우 + 어 + 지 + 었 + 다)
+            if decompose is None:
+                mor_info = decompose_expression(attrs[-1], join=join, coda_normalization=coda_normalization)
+            else:
+                mor_info = decompose(attrs[-1])
+
+            if mor_info:
+                yield from mor_info
+                continue
+
+        if coda_normalization:
+            s = s.translate(coda_normalization_table)
+        yield s + '/' + token_pos if join else (s, token_pos)
+
+
+# a predicate on (morpheme, POS) for Mecab.pos_filter()
+class MorphemeFilter():
+    """Filter of morphemes by their POS tags, a stopword list and their length, compiled once.
+
+    .. code-block:: python
+
+        >>> content = MorphemeFilter(include_tags=['NN*', 'VV', 'VA', 'XR'], stopwords=['것'], min_len=1)
+        >>> mecab.pos_filter(u'이게 뭔지 알아.', morpheme_filter=content)
+        [('알', 'VV')]
+
+    :param include_tags: Patterns of the tags kept (e.g. 'NN*', 'VV'). The default is all the tags. An empty list keeps none.
+    :param exclude_tags: Patterns of the tags dropped.
+    :param stopwords: Morphemes dropped.
+    :param min_len: The minimum length of the morphemes kept.
+    """
+
+    def accept_tag(self, tag):
+        accepted = self.tags.get(tag)
+        if accepted is None:    # matching each tag against the patterns only once
+            accepted = self.tags[tag] = ((self.include is None or self.include.match(tag) is not None)
+                                         and (self.exclude is None or self.exclude.match(tag) is None))
+        return accepted
+
+    def __call__(self, morpheme, tag):
+        return self.accept_tag(tag) and len(morpheme) >= self.min_len and morpheme not in self.stopwords
+
+    def __init__(self, include_tags=None, exclude_tags=None, stopwords=None, min_len=0):
+        # an empty list of patterns matches no tag ('(?!)'), not every tag as the empty pattern would
+        compile_patterns = lambda patterns: re.compile('|'.join(fnmatch.translate(p) for p in ([patterns] if isinstance(patterns, str) else patterns)) or '(?!)')
+        self.include = compile_patterns(include_tags) if include_tags is not None else None
+        self.exclude = compile_patterns(exclude_tags) if exclude_tags else None
+        self.stopwords = frozenset(stopwords or ())
+        self.min_len = min_len
+        self.tags = dict()  # tag: whether it is accepted
+
+
+morphs_filter = MorphemeFilter()                    # all the morphemes
+nouns_filter = MorphemeFilter(include_tags='N*')    # nouns (NNG, NNP, NNB, NNBC, NR, NP)
+
+
+# function for getting the (morpheme, POS)s accepted by a MorphemeFilter, in a single pass over the analysed result
+# same as [x for x in iter_parse_fixed(result) if accept(x[0], x[1])], but the dropped morphemes are never built
+def iter_filter_fixed(result, accept, join=False, coda_normalization=True, decompositions=None):
+    accept_tag, stopwords, min_len = accept.accept_tag, accept.stopwords, accept.min_len
+    decompose = decompositions.decomposer(coda_normalization=coda_normalization) if decompositions is not None else None
+
+    for elem in result.splitlines()[:-1]:
+        if not elem:    # troubleshooting an unanalyzable character
+            if accept('', 'SY'):
+                yield '/SY' if join else ('', 'SY')
+            continue
+
+        s, t = elem.split('\t')
+        attrs = t.split(',')
+        token_pos = attrs[0]
+
+        if attrs[4].startswith("Inflect"):  # the decomposed morphemes are filtered (e.g. 좋아해 > 좋아하/VV, 아/EF)
+            if decompose is None:
+                mor_info = decompose_expression(attrs[-1], coda_normalization=coda_normalization)
+            else:
+                mor_info = decompose(attrs[-1])
+            if mor_info:
+                for x in mor_info:
+                    if accept_tag(x[1]) and len(x[0]) >= min_len and x[0] not in stopwords:
+                        yield '/'.join(x) if join else x
+                continue
+
+        if not accept_tag(token_pos):
+            continue
+        if coda_normalization:
+            s = s.translate(coda_normalization_table)
+        if len(s) >= min_len and s not in stopwords:
+            yield s + '/' + token_pos if join else (s, token_pos)
+
+
+# function for decomposing a token into a list of (morpheme, POS) (or morpheme/POS)
+# e.g. ('좋아해', 'VV+EF,*,F,좋아해,Inflect,VV,EF,좋아하/VV/*+아/EF/*')  >  [('좋아하', 'VV'), ('아', 'EF')]
+def split_fixed(s, t, join=False, coda_normalization=True, decompositions=None):
+    # s: a token (e.g. 좋아해)    # t: attrs of the token (e.g. VV+EF,*,F,좋아해,Inflect,VV,EF,좋아하/VV/*+아/EF/*)
+    # decompositions: a DecompositionCache (optional)
+
+    attrs = t.split(',')
+    token_pos = attrs[0]
+
+    if attrs[4].startswith("Inflect"):  # If an eojeol is Inflect (e.g. 불태워졌다 != 불태우 + 어 + 지 + 었 + 다)
+        if decompositions is None:
+            mor_info = decompose_expression(attrs[-1], join=join, coda_normalization=coda_normalization, nested=True)
+        else:
+            mor_info = decompositions.get(attrs[-1], join=join, coda_normalization=coda_normalization, nested=True)
+        if mor_info:
+            return list(mor_info)
+
+    if coda_normalization:
+        s = s.translate(coda_normalization_table)
+    return [s + '/' + token_pos] if join else [(s, token_pos)]
+
+
+# function for grouping the morphemes of the lines of an analysed result by eojeol, for all the eojeol-grouped results
+# (parse_fixed_eojeol(), parse_eojeol(), parse_tokens() and Encoder.encode()). The morphemes of the lines are concatenated
+# until their surfaces make the next eojeol of the phrase (e.g. 알 > 알+았 > 알+았+어요), and the lines which cannot be aligned
+# to the eojeols make the last group
+def iter_eojeols(result, phrase, split_line):
+    # result: an analysed result of a sentence (e.g. 너를 좋아해. > 너\tNP,*,F,너,*,*,*,*\n를\tJKO,*,T,를,*,*,*,*\n좋아해\tVV+EF,*,F,좋아해,Inflect,VV,EF,좋아하/VV/*+아/EF/*\n.\tSF,*,*,*,*,*,*,*\nEOS\n)
+    # phrase: the sentence analysed into 'result'. Its eojeols (e.g. ['너를', '좋아해.']) are used for grouping morphemes
+    # split_line(elem): the morphemes of a line (a list or a tuple), and its surface without blanks ('' for an unanalyzable character)
+
+    phrase2ej = phrase.split()  # eojeol list # ['너를', '좋아해.']
+    phrase2ej.append(None)      # no more eojeols
+    eojeol = phrase2ej[0]       # the next eojeol
+    count = 0                   # the number of the grouped eojeols
+    ej_mor = list()     # list for an 2-D (flattened) eojeol list: [(morpheme, POS), ...]
+    concat_mor = ""
+
+    for elem in result.splitlines()[:-1]:
+        mor_info, surface = split_line(elem)
+        ej_mor += mor_info
+        if surface:
+            concat_mor += surface   # concatenating morphemes until the string is equal to their original eojeol
+            if concat_mor == eojeol:
+                yield ej_mor
+                count += 1
+                eojeol = phrase2ej[count]
+                ej_mor = list()
+                concat_mor = ""
+
+    if ej_mor:  # morphemes which could not be aligned to the eojeols
+        yield ej_mor
+
+
+# function for getting the eojeol-grouped (morpheme, POS) list of a sentence in a single pass over the analysed result
+# output of parse_fixed()        : [('너', 'NP'), ('를', 'JKO'), ('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')]
+# output of parse_fixed_eojeol() : [[('너', 'NP'), ('를', 'JKO')], [('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')]]
+def parse_fixed_eojeol(result, phrase, join=False, coda_normalization=True, decompositions=None):
+    unanalyzable = (['/SY'] if join else [('', 'SY')], '')  # troubleshooting an unanalyzable character
+
+    def split_line(elem):
+        if not elem:
+            return unanalyzable
+        s, t = elem.split('\t')
+        return split_fixed(s, t, join=join, coda_normalization=coda_normalization, decompositions=decompositions), s.strip()
+
+    return list(iter_eojeols(result, phrase, split_line))
+    # example of the result
+    # [[('너', 'NP'), ('를', 'JKO')], [('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')]]
+
+
+# function for grouping the morphemes of the original version by eojeol in the same way as parse_fixed_eojeol(),
+# so that the eojeols of the two versions are compared one by one (see Mecab.pos_dual())
+def parse_eojeol(result, phrase, join=False):
+    unanalyzable = (['/SY'] if join else [('', 'SY')], '')
+
+    def split_line(elem):
+        if not elem:
+            return unanalyzable
+        s, t = elem.split('\t')
+        return [s + '/' + t.split(',', 1)[0] if join else (s, t.split(',', 1)[0])], s.strip()
+
+    return list(iter_eojeols(result, phrase, split_line))
+
+
+# a morpheme with all the features of MeCab-ko (see attrs), for Mecab.pos_tokens()
+class Token():
+    """A morpheme with its POS tag, keeping the feature string of MeCab-ko, whose fields are split only when one of them is accessed.
+
+    A morpheme decomposed from an Inflect token (e.g. 좋아하/VV of 좋아해/VV+EF) has the token as its source, and shares its features.
+    A Token unpacks like a (morpheme, POS) pair.
+
+    .. code-block:: python
+
+        >>> token = mecab.pos_tokens(u'너를 좋아해.')[2]
+        >>> token, token.source, token.index, token.type, token.indexed
+        (좋아하/VV, 좋아해/VV+EF, 0, 'Inflect', '좋아하/VV/*+아/EF/*')
+    """
+
+    __slots__ = ('surface', 'tag', 'feature', 'source', 'index', 'fields')
+
+    def field(self, i):
+        # the i-th field of the features. None if MeCab-ko gives fewer fields (e.g. for an unanalyzable character)
+        if self.fields is None:
+            self.fields = self.feature.split(',') if self.feature else []
+        return self.fields[i] if i < len(self.fields) else None
+
+    # the fields named in attrs. The features of mecab-ko-dic 2.x have no 'original' (원형): their last field is 'indexed'
+    tags = property(lambda self: self.field(0), doc='the POS tag of the token of MeCab-ko (e.g. VV+EF)')
+    semantic = property(lambda self: self.field(1))
+    has_jongsung = property(lambda self: self.field(2))
+    read = property(lambda self: self.field(3))
+    type = property(lambda self: self.field(4))
+    first_pos = property(lambda self: self.field(5))
+    last_pos = property(lambda self: self.field(6))
+    original = property(lambda self: self.field(7) if self.field(8) is not None else None)
+    indexed = property(lambda self: self.field(8) if self.field(8) is not None else self.field(7))
+
+    def __iter__(self):
+        return iter((self.surface, self.tag))
+
+    def __repr__(self):
+        return '%s/%s' % (self.surface, self.tag)
+
+    def __init__(self, surface, tag, feature, source=None, index=None):
+        self.surface = surface
+        self.tag = tag
+        self.feature = feature  # the feature string of MeCab-ko (e.g. VV+EF,*,F,좋아해,Inflect,VV,EF,좋아하/VV/*+아/EF/*)
+        self.source = source    # the Inflect token which the morpheme is decomposed from
+        self.index = index      # the index of the morpheme in the index expression of its source
+        self.fields = None      # the split features, on first access
+
+
+# Token version of split_fixed()
+def split_tokens(s, t, coda_normalization=True, decompositions=None):
+    attrs = t.split(',')
+    token_pos = attrs[0]
+
+    if attrs[4].startswith("Inflect"):
+        if decompositions is None:
+            mor_info = decompose_expression(attrs[-1], coda_normalization=coda_normalization, nested=True)
+        else:
+            mor_info = decompositions.get(attrs[-1], coda_normalization=coda_normalization, nested=True)
+        if mor_info:
+            source = Token(s.translate(coda_normalization_table) if coda_normalization else s, token_pos, t)
+            return [Token(mor, pos, t, source, i) for i, (mor, pos) in enumerate(mor_info)]
+
+    if coda_normalization:
+        s = s.translate(coda_normalization_table)
+    return [Token(s, token_pos, t)]
+
+
+# function for getting the Tokens of a sentence, grouped by eojeol as parse_fixed_eojeol() does if flatten is False
+def parse_tokens(result, phrase, flatten=True, use_original=False, coda_normalization=True, decompositions=None):
+    def split_line(elem):
+        if not elem:    # an unanalyzable character
+            return [Token('', 'SY', '')], ''
+        s, t = elem.split('\t')
+        if use_original:
+            return [Token(s, t.split(',', 1)[0], t)], s.strip()
+        return split_tokens(s, t, coda_normalization=coda_normalization, decompositions=decompositions), s.strip()
+
+    if flatten:
+        return list(itertools.chain.from_iterable(split_line(elem)[0] for elem in result.splitlines()[:-1]))
+    return list(iter_eojeols(result, phrase, split_line))
+
+
+# function for splitting a long text into chunks of at most max_chars characters for Mecab.pos(max_chunk_chars=...)
+# A chunk ends before a blank (so no eojeol is split), preferably after a sentence ender, then at a newline.
+# An eojeol longer than max_chars is kept whole
+chunk_sentence_end = re.compile('[.?!。…][\'"’”)\\]]*(?=[ \t\r\n])')
+chunk_blank = re.compile('[ \t\r\n]')
+
+
+def split_chunks(text, max_chars):
+    max_chars = max(max_chars, 1)   # every chunk has at least one character, so the loop always moves forward
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars     # the chunk is text[start:cut] with start < cut <= end
+        half = start + max_chars // 2
+
+        sentence_ends = [m.end() for m in chunk_sentence_end.finditer(text, half, end)]
+        if sentence_ends and sentence_ends[-1] > start:
+            cut = sentence_ends[-1]
+        else:
+            cut = text.rfind('\n', half, end + 1)
+            if cut <= start:
+                cut = max(text.rfind(c, start + 1, end + 1) for c in ' \t\r\n')
+            if cut <= start:    # no blank in the window: cutting after the long eojeol
+                blank = chunk_blank.search(text, end)   # a single forward search: text.find() of each blank would scan to the end
+                if blank is None:
+                    break
+                cut = blank.start()
+
+        assert cut > start
+        yield text[start:cut]
+        start = cut
+    yield text[start:]
+
+
 # function for multiple replacing   # https://stackoverflow.com/questions/6116978/how-to-replace-multiple-substrings-of-a-string
 def replace_multiple(string, replace_list):
     # replace_tuples: [("brown", "red"), ("lazy", "quick")]
@@ -129,6 +561,118 @@ def replace_multiple(string, replace_list):
     return string
 
 
+# function for the lengths of the common prefix and suffix of a replaced string and its replacement,
+# which keep their own offsets (e.g. 영치기 영차 > 영치기영차: 3 (영치기), 2 (영차)), or of two versions of a document (see IncrementalAnalyzer).
+# The lengths are found by bisection with slice comparisons, so long strings are compared at the speed of C
+def common_affix_lengths(old, new):
+    prefix, high = 0, min(len(old), len(new))
+    while prefix < high:    # old[:prefix] == new[:prefix], and the common prefix is at most high characters
+        mid = (prefix + high + 1) // 2
+        if old[prefix:mid] == new[prefix:mid]:
+            prefix = mid
+        else:
+            high = mid - 1
+
+    suffix, high = 0, min(len(old), len(new)) - prefix
+    while suffix < high:
+        mid = (suffix + high + 1) // 2
+        if old[len(old) - mid:len(old) - suffix] == new[len(new) - mid:len(new) - suffix]:
+            suffix = mid
+        else:
+            high = mid - 1
+    return prefix, suffix
+
+
+# replacement rules applied in a single scan, however many they are
+class ReplaceRules():
+    """Replacement rules (old, new) compiled into one regular expression.
+
+    All the rules are applied in one scan, taking the longest rule at each position.
+    A single-character rule is also applied inside the longer rules after it, as replace_multiple() does
+    (e.g. with [('\u3000', ' '), ('영치기 영차', '영치기영차')], '영치기\u3000영차' becomes '영치기영차').
+    Otherwise the rules differ from replace_multiple(), which applies them one after another:
+    overlapping rules take the longest match, not the first rule (with [('ab', 'X'), ('abc', 'Y')], 'abc' becomes 'Y', not 'Xc'),
+    and a replacement is not replaced again by the later rules (with [('a', 'b'), ('b', 'c')], 'ab' becomes 'bc', not 'cc').
+
+    :param rules: A list of (old, new).
+    """
+
+    @classmethod
+    def from_file(cls, path):
+        """Load the rules from a file of 'old<TAB>new' lines. Empty lines and lines starting with # are skipped."""
+
+        rules = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                if line and not line.startswith('#'):
+                    old, _, new = line.partition('\t')
+                    rules.append((old, new))
+        return cls(rules)
+
+    def replace(self, string):
+        if self.pattern is None:
+            return string
+        return self.pattern.sub(self.replacement, string)
+
+    def replace_offsets(self, string):
+        """replace() which also returns the offset of each character in the original string, and the original length.
+
+        A replaced string keeps the offsets of its common prefix and suffix with the replacement (see common_affix_lengths()),
+        e.g. '영치기 영차!' > ('영치기영차!', [0, 1, 2, 4, 5, 6, 7]).
+        """
+
+        if self.pattern is None:
+            return string, list(range(len(string) + 1))
+
+        parts = []
+        origin = []
+        last = 0
+        for match in self.pattern.finditer(string):
+            start, end = match.span()
+            old, new = match.group(), self.replacements[match.lastindex - 1]
+            prefix, suffix = common_affix_lengths(old, new)
+
+            parts.append(string[last:start])
+            origin.extend(range(last, start))
+            parts.append(new)
+            origin.extend(start + j if j < prefix else
+                          end - (len(new) - j) if j >= len(new) - suffix else
+                          start + prefix for j in range(len(new)))
+            last = end
+        parts.append(string[last:])
+        origin.extend(range(last, len(string) + 1))
+        return ''.join(parts), origin
+
+    def replacement(self, match):
+        return self.replacements[match.lastindex - 1]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __init__(self, rules):
+        self.rules = []
+        chars = dict()  # old character: characters replaced into it by the preceding rules (e.g. ' ': ' \u3000')
+        alternatives = []   # (-length, order, pattern, new)
+        seen = set()
+        for order, (old, new) in enumerate(rules):
+            if not old:
+                raise Exception('The replaced string of a replacement rule must not be empty: (%r, %r)' % (old, new))
+            self.rules.append((old, new))
+            if old in seen:     # only the first rule for a string is applied
+                continue
+            seen.add(old)
+
+            pattern = ''.join('[%s]' % re.escape(chars[c]) if c in chars else re.escape(c) for c in old)
+            alternatives.append((-len(old), order, pattern, new))
+            if len(old) == 1 and len(new) == 1:
+                chars[new] = chars.get(new, new) + old
+
+        alternatives.sort()     # the longest first
+        self.pattern = re.compile('|'.join('(%s)' % pattern for _, _, pattern, _ in alternatives)) if alternatives else None
+        self.replacements = [new for _, _, _, new in alternatives]   # new of each group of the pattern
+
+
 # unicode error correction      # (타당하 + ㄴ지  vs. 뭐 + 이 +  ᆫ지) ->  ᆫ지    # "ᆼ" -> "ㅇ"
 def hangul_unicode_correction(parsed: str):
     result_split_n = parsed.split("\n")[:-2]  # remove 'EOS', ''
@@ -142,6 +686,1465 @@ def hangul_unicode_correction(parsed: str):
     return result_corrected_final
 
 
+######################## node-based analysis ############################
+# The functions below walk the node list of MeCab-ko (Tagger.parseToNode()) instead of splitting the analysed string.
+# An eojeol boundary is taken from the whitespace before each node (node.rlength > node.length).
+
+MECAB_NOR_NODE = 0
+MECAB_BOS_NODE = 2
+MECAB_EOS_NODE = 3
+
+
+# function for iterating over the nodes of a sentence
+# e.g. 너를 좋아해. > ('너', 'NP,*,F,너,*,*,*,*', False), ('를', 'JKO,*,T,를,*,*,*,*', False), ('좋아해', 'VV+EF,...', True), ('.', 'SF,*,*,*,*,*,*,*', False)
+def iter_node(node):
+    while node is not None:
+        if node.stat != MECAB_BOS_NODE and node.stat != MECAB_EOS_NODE:
+            yield node.surface, node.feature, node.rlength > node.length  # (surface, attrs, whether the node is preceded by whitespace)
+        node = node.next
+
+
+# function for grouping the (morpheme, POS) lists of nodes by eojeol
+def group_node(tokens):
+    # tokens: (surface, [(morpheme, POS), ...], whether the node is preceded by whitespace)
+
+    pos_result = list() # list for the final result: 3-D (unflattened) list
+    ej_mor = list()     # list for an 2-D (flattened) eojeol list: [(morpheme, POS), ...]
+    pending = list()    # morphemes of whitespace tokens (e.g. '\u3000/SY'), which belong to the next eojeol
+    boundary = False
+
+    for surface, mor_info, spaced in tokens:
+        if surface.isspace():   # whitespace which MeCab-ko analyses as a token (e.g. '\u3000')
+            boundary = True
+            pending += mor_info
+            continue
+
+        if (spaced or boundary or surface[:1].isspace()) and ej_mor:    # a token after whitespace begins a new eojeol
+            pos_result.append(ej_mor)
+            ej_mor = list()
+
+        ej_mor += pending + mor_info
+        pending = list()
+        boundary = surface[-1:].isspace()   # e.g. '?\u3000' ends an eojeol
+
+    ej_mor += pending
+    if ej_mor:
+        pos_result.append(ej_mor)
+
+    return pos_result
+
+
+# node-based version of parse()
+def parse_node(node, join=False):
+    return group_node((s, [s + '/' + t.split(',', 1)[0] if join else (s, t.split(',', 1)[0])], spaced)
+                      for s, t, spaced in iter_node(node))
+
+
+# node-based version of parse_fixed_eojeol()
+def parse_fixed_node(node, join=False, coda_normalization=True, decompositions=None):
+    return group_node((s, split_fixed(s, t, join=join, coda_normalization=coda_normalization, decompositions=decompositions), spaced)
+                      for s, t, spaced in iter_node(node))
+#########################################################################
+
+
+# function for creating a tagger of MeCab-ko
+# backends: functions creating a tagger of MeCab-ko from the path of a dictionary.
+# A tagger has parse(text) which returns the analysed result of MeCab-ko as a string
+# (e.g. 이게\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*\n...EOS\n), and parseToNode(text) for use_node=True.
+
+# backend of mecab-python3 (MeCab)
+def load_tagger(dicpath):
+    try:
+        from MeCab import Tagger
+    except ImportError:
+        raise Exception('Install MeCab in order to use it: http://konlpy.org/en/latest/install/')
+
+    try:
+        return Tagger('-d %s' % dicpath)
+    except RuntimeError:
+        raise Exception('The MeCab dictionary does not exist at "%s". Is the dictionary correctly installed?\nYou can also try entering the dictionary path when initializing the Mecab class: "Mecab(\'/some/dic/path\')"' % dicpath)
+
+
+# backend of python-mecab-ko (mecab)
+mecab_ko_module = None  # the binding of python-mecab-ko, loaded on first use
+
+
+def import_mecab_ko():
+    # python-mecab-ko installs its binding as the top-level module _mecab, which this module shadows when it is imported as _mecab
+    global mecab_ko_module
+
+    if mecab_ko_module is None:
+        import importlib.machinery
+        import importlib.util
+
+        module = sys.modules.get('_mecab')
+        if module is None or not hasattr(module, 'Lattice'):
+            for path in sys.path:
+                spec = importlib.machinery.PathFinder.find_spec('_mecab', [path])
+                if spec is not None and isinstance(spec.loader, importlib.machinery.ExtensionFileLoader):
+                    module = importlib.util.module_from_spec(spec)
+                    spec.loader.exec_module(module)
+                    break
+            else:
+                raise Exception('Install python-mecab-ko in order to use it: https://github.com/jonghwanhyeon/python-mecab-ko')
+        mecab_ko_module = module
+    return mecab_ko_module
+
+
+class MecabKoTagger():
+    """Adapter of a tagger of python-mecab-ko to the interface of mecab-python3."""
+
+    def lattice(self, text):
+        lattice = self.module.Lattice()
+        lattice.add_request_type(self.module.MECAB_ALLOCATE_SENTENCE)
+        lattice.set_sentence(text)
+        if not self.tagger.parse(lattice):
+            raise RuntimeError(self.tagger.what())
+        return lattice
+
+    def parse(self, text):
+        return self.lattice(text).to_string()
+
+    def parseToNode(self, text):
+        lattice = self.lattice(text)
+        self.last_lattice = lattice     # keeping the nodes alive until the next analysis
+        return lattice.bos_node()
+
+    def __init__(self, dicpath):
+        import importlib.util
+
+        self.module = import_mecab_ko()
+        spec = importlib.util.find_spec('mecab')     # the directory of python-mecab-ko, which has its mecabrc
+        rcfile = os.path.join(spec.submodule_search_locations[0], 'mecabrc')
+        try:
+            self.tagger = self.module.Tagger(['--rcfile', rcfile, '--dicdir', str(dicpath)])
+        except RuntimeError:
+            raise Exception('The MeCab dictionary does not exist at "%s". Is the dictionary correctly installed?\nYou can also try entering the dictionary path when initializing the Mecab class: "Mecab(\'/some/dic/path\')"' % dicpath)
+        self.last_lattice = None
+
+
+# backend of recorded results, e.g. for running the post-processing (and its benchmarks) without MeCab-ko
+class RecordingTagger():
+    """Tagger storing the results of another tagger."""
+
+    def parse(self, text):
+        result = self.tagger.parse(text)
+        self.results[text] = result
+        return result
+
+    def parseToNode(self, text):
+        # the analysed string is recorded, from which ReplayTagger.parseToNode() rebuilds the nodes
+        self.results[text] = self.tagger.parse(text)
+        return self.tagger.parseToNode(text)
+
+    def __init__(self, tagger, results):
+        self.tagger = tagger
+        self.results = results
+
+
+class RecordBackend():
+    """Backend recording the results of another backend, to be saved for ReplayBackend.
+
+    .. code-block:: python
+
+        >>> backend = RecordBackend('results.json')
+        >>> mecab = Mecab(backend=backend)
+        >>> mecab.pos(u'너를 좋아해.')
+        >>> backend.save()
+        >>> Mecab(backend=ReplayBackend('results.json')).pos(u'너를 좋아해.')  # without MeCab-ko
+
+    :param path: The path of the JSON file of the results.
+    :param backend: The backend recorded.
+    """
+
+    def save(self, path=None, **metadata):
+        """Save the results (and metadata, e.g. the corpus of a benchmark) into the JSON file."""
+
+        import json
+
+        with open(path or self.path, 'w', encoding='utf-8') as f:
+            json.dump(dict(metadata, results=self.results), f, ensure_ascii=False)
+
+    def __call__(self, dicpath):
+        return RecordingTagger(get_backend(self.backend)(dicpath), self.results)
+
+    # equal for the same file, so that the unpickled copies of a backend share their taggers (see get_shared_pool())
+    def __eq__(self, other):
+        return type(other) is type(self) and (other.path, other.backend) == (self.path, self.backend)
+
+    def __hash__(self):
+        return hash((type(self).__name__, self.path, self.backend))
+
+    def __init__(self, path, backend='mecab-python3'):
+        self.path = path
+        self.backend = backend
+        self.results = dict()   # text: analysed result
+
+
+# a node of MeCab-ko rebuilt from a recorded result, with the attributes which iter_node() reads
+class ReplayNode():
+    def __init__(self, surface, feature, stat=MECAB_NOR_NODE, length=0, rlength=0):
+        self.surface = surface
+        self.feature = feature
+        self.stat = stat
+        self.length = length    # in characters, not in bytes as MeCab-ko. Only rlength > length (whitespace before the node) matters
+        self.rlength = rlength  # the length with the whitespace before the node
+        self.next = None
+
+
+class ReplayTagger():
+    """Tagger returning the recorded results of MeCab-ko.
+
+    Tagger.parseToNode() (use_node=True) rebuilds the nodes from the recorded string: the whitespace before each node
+    is found in the text, and an unanalyzable character (an empty line) becomes a node of SY with an empty surface.
+    """
+
+    def parse(self, text):
+        try:
+            return self.results[text]
+        except KeyError:
+            raise Exception('No recorded result for "%s". Record the text with RecordBackend first.' % text)
+
+    def parseToNode(self, text):
+        bos = node = ReplayNode('', 'BOS/EOS,*,*,*,*,*,*,*', MECAB_BOS_NODE)
+        cursor = 0  # offset in 'text' after the last surface found
+        for elem in self.parse(text).splitlines()[:-1]:
+            s, t = elem.split('\t') if elem else ('', 'SY,*,*,*,*,*,*,*')
+            start = cursor
+            while start < len(text) and text[start].isspace() and not text.startswith(s, start):
+                start += 1
+            if s and text.startswith(s, start):
+                node.next = ReplayNode(s, t, length=len(s), rlength=start - cursor + len(s))
+                cursor = start + len(s)
+            else:   # a surface which is not in the text as it is
+                node.next = ReplayNode(s, t, length=len(s), rlength=len(s))
+            node = node.next
+        node.next = ReplayNode('', 'BOS/EOS,*,*,*,*,*,*,*', MECAB_EOS_NODE)
+        return bos
+
+    def __init__(self, results):
+        self.results = results
+
+
+class ReplayBackend():
+    """Backend returning the results recorded by RecordBackend, without MeCab-ko. The dictionary path is ignored.
+
+    :param path: The path of the JSON file of the results.
+    """
+
+    def load(self):
+        import json
+
+        if self.results is None:
+            with open(self.path, encoding='utf-8') as f:
+                recorded = json.load(f)
+            self.results = recorded.pop('results')
+            self.metadata = recorded
+        return self
+
+    def __call__(self, dicpath):
+        return ReplayTagger(self.load().results)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.path == self.path
+
+    def __hash__(self):
+        return hash((type(self).__name__, self.path))
+
+    def __init__(self, path):
+        self.path = path
+        self.results = None
+        self.metadata = None
+
+
+BACKENDS = {'mecab-python3': load_tagger, 'python-mecab-ko': MecabKoTagger}
+
+
+def get_backend(backend):
+    # a backend is a name in BACKENDS or a function creating a tagger from a dictionary path
+    if callable(backend):
+        return backend
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise Exception('Unknown backend "%s". Choose one of %s or pass a function creating a tagger.' % (backend, ', '.join(sorted(BACKENDS))))
+
+
+# a bounded pool of taggers. A tagger of MeCab-ko must not be used by several threads at the same time.
+class TaggerPool():
+    """Pool of MeCab-ko taggers shared by threads.
+
+    :param factory: A function which creates a new tagger.
+    :param size: The maximum number of taggers.
+    :param taggers: Taggers which are already created.
+    """
+
+    def acquire(self):
+        """Check out an idle tagger. Waits for one if all the taggers are in use."""
+
+        with self.condition:
+            while not self.idle:
+                if self.created < self.size:    # creating a new tagger outside the lock
+                    self.created += 1
+                    break
+                self.condition.wait()
+            else:
+                return self.idle.pop()
+
+        try:
+            return self.factory()
+        except BaseException:
+            with self.condition:
+                self.created -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, tagger):
+        """Return a tagger checked out by acquire()."""
+
+        with self.condition:
+            self.idle.append(tagger)
+            self.condition.notify()
+
+    def __init__(self, factory, size=1, taggers=()):
+        self.factory = factory
+        self.size = max(size, len(taggers), 1)
+        self.idle = list(taggers)   # taggers which are not in use
+        self.created = len(self.idle)
+        self.condition = threading.Condition(threading.Lock())
+
+
+# approximate memory size of a cached result of Mecab.pos()
+def sizeof_result(key, value):
+    size = sys.getsizeof(key) + sys.getsizeof(key[0]) + sys.getsizeof(value)
+    for x in value:
+        size += sys.getsizeof(x)
+        if isinstance(x, tuple):    # (morpheme, POS) or an eojeol
+            size += sum(sys.getsizeof(y) for y in x)
+    return size
+
+
+# a bounded LRU cache for the results of Mecab.pos()
+class ResultCache():
+    """LRU cache of immutable results, bounded by the number of entries and/or their memory size.
+
+    :param maxsize: The maximum number of entries.
+    :param maxbytes: The maximum memory size of the entries in bytes (see sizeof_result()).
+    """
+
+    CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'size', 'maxsize', 'bytes', 'maxbytes'])
+
+    def get(self, key):
+        with self.lock:
+            try:
+                value, size = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = sizeof_result(key, value) if self.maxbytes else 0
+        if self.maxbytes and size > self.maxbytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+
+            while (self.maxsize and len(self.entries) > self.maxsize) or (self.maxbytes and self.bytes > self.maxbytes):
+                self.bytes -= self.entries.popitem(last=False)[1][1]  # evicting the least recently used entry
+                self.evictions += 1
+
+    def info(self):
+        with self.lock:
+            return self.CacheInfo(self.hits, self.misses, self.evictions, len(self.entries), self.maxsize, self.bytes, self.maxbytes)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __init__(self, maxsize=None, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.entries = collections.OrderedDict()    # key: (value, size)
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+
+
+# function for fingerprinting the MeCab-ko dictionary, so that cached results of an older dictionary are not used (see DiskCache)
+def dictionary_fingerprint(dicpath, content=False):
+    """A hex digest of the names, sizes and modification times of the files in the dictionary directory.
+
+    :param content: If True, hashes the contents of the files instead of their modification times (slower,
+        but the fingerprint is kept when the dictionary is copied to another machine).
+    """
+
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        names = sorted(os.listdir(dicpath))
+    except OSError:     # e.g. ReplayBackend, which does not read the dictionary
+        names = []
+    for name in names:
+        path = os.path.join(dicpath, name)
+        if not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        digest.update(('%s\0%d\0' % (name, stat.st_size)).encode('utf-8'))
+        if content:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        else:
+            digest.update(b'%d\0' % stat.st_mtime_ns)
+    return digest.hexdigest()
+
+
+# a persistent cache for the results of Mecab.pos(), shared by processes
+class DiskCache():
+    """Content-addressed cache of results in an SQLite database.
+
+    An entry is keyed by a hash of the key (e.g. a phrase and the options of pos()) and the fingerprint of the dictionary,
+    so the entries of an older dictionary are never returned (purge() deletes them). The database is in WAL mode:
+    any number of processes read it concurrently while one of them writes. Each thread of a process has its own connection.
+    The values are stored with marshal, so they must be plain data (e.g. lists and tuples of strings), and loading a file
+    written by someone else never runs code.
+
+    .. code-block:: python
+
+        >>> cache = DiskCache('pos.sqlite', fingerprint=dictionary_fingerprint(dicpath))
+        >>> cache.put_many([('너를 좋아해.', [('너', 'NP'), ('를', 'JKO'), ...])])
+        >>> cache.get_many(['너를 좋아해.', '들어간다'])
+        [[('너', 'NP'), ('를', 'JKO'), ...], None]
+
+    :param path: The path of the database file.
+    :param fingerprint: The fingerprint of the dictionary (see dictionary_fingerprint()).
+    :param timeout: The seconds to wait for the lock of another writer.
+    """
+
+    CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'size'])
+
+    def connection(self):
+        # the connection of the thread, opened on first use (and again in a forked process)
+        local = self.local
+        if getattr(local, 'pid', None) != os.getpid():
+            import sqlite3
+
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')     # durable at checkpoints, enough for a cache
+            connection.execute('CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, fingerprint TEXT, value BLOB)')
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def hash_key(self, key):
+        import hashlib
+
+        return hashlib.blake2b(('%s\0%s' % (self.fingerprint, key)).encode('utf-8'), digest_size=16).digest()
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def get_many(self, keys):
+        """The values of the keys (None for a missing key), looked up in batches."""
+
+        import marshal
+
+        hashed = [self.hash_key(key) for key in keys]
+        found = {}
+        connection = self.connection()
+        for i in range(0, len(hashed), 500):    # the number of parameters of a statement is limited
+            batch = hashed[i:i + 500]
+            query = 'SELECT key, value FROM results WHERE key IN (%s)' % ','.join('?' * len(batch))
+            found.update(connection.execute(query, batch).fetchall())
+
+        values = []
+        for h in hashed:
+            try:
+                values.append(marshal.loads(found[h]) if h in found else None)
+            except (ValueError, EOFError, TypeError):   # a broken entry (or one of another format) is a miss
+                found.pop(h)
+                values.append(None)
+        hits = sum(h in found for h in hashed)
+        with self.lock:
+            self.hits += hits
+            self.misses += len(hashed) - hits
+        return values
+
+    def put(self, key, value):
+        return self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """Store (key, value) pairs in a single transaction. Returns False if the database stayed locked by other writers."""
+
+        import marshal
+        import sqlite3
+
+        rows = [(self.hash_key(key), self.fingerprint, marshal.dumps(value, 4)) for key, value in items]
+        connection = self.connection()
+        try:
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?)', rows)
+        except sqlite3.OperationalError:    # a cache does not fail the analysis
+            return False
+        return True
+
+    def purge(self):
+        """Delete the entries of the other fingerprints (e.g. of an older dictionary)."""
+
+        with self.connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('DELETE FROM results WHERE fingerprint != ?', (self.fingerprint,))
+
+    def info(self):
+        size = self.connection().execute('SELECT COUNT(*) FROM results WHERE fingerprint = ?', (self.fingerprint,)).fetchone()[0]
+        with self.lock:
+            return self.CacheInfo(self.hits, self.misses, size)
+
+    def clear(self):
+        with self.connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('DELETE FROM results')
+        with self.lock:
+            self.hits = self.misses = 0
+
+    def __init__(self, path, fingerprint='', timeout=30.0):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.timeout = timeout
+        self.local = threading.local()  # the connection of each thread
+        self.hits = self.misses = 0     # of this process
+        self.lock = threading.Lock()
+
+
+# timings and counters of Mecab.pos() (see Mecab.stats())
+class PosStats():
+    """Cumulative timings per stage, input lengths, Inflect tokens and the slowest inputs of Mecab.pos().
+
+    :param hook: A function called with the timings of every call (e.g. for exporting them to a metrics system).
+    :param slowest_size: The number of the slowest inputs kept.
+    """
+
+    def record(self, timings, length, inflects, phrase):
+        with self.lock:
+            self.calls += 1
+            for stage, seconds in timings.items():
+                timer = self.timers.get(stage)
+                if timer is None:
+                    timer = self.timers[stage] = [0, 0.0]
+                timer[0] += 1
+                timer[1] += seconds
+            bucket = length.bit_length()    # 0, 1, 2-3, 4-7, 8-15, ... characters
+            self.lengths[bucket] = self.lengths.get(bucket, 0) + 1
+            self.inflects += inflects
+
+            self.serial += 1    # breaking ties of the heap without comparing the phrases
+            if len(self.slowest) < self.slowest_size:
+                heapq.heappush(self.slowest, (timings['total'], self.serial, phrase))
+            elif timings['total'] > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (timings['total'], self.serial, phrase))
+
+        if self.hook is not None:
+            self.hook(dict(timings, length=length, inflects=inflects))
+
+    def snapshot(self):
+        with self.lock:
+            return {'calls': self.calls,
+                    'stages': {stage: {'calls': count, 'seconds': seconds, 'mean': seconds / count} for stage, (count, seconds) in self.timers.items()},
+                    'lengths': {'%d-%d' % (1 << bucket >> 1, (1 << bucket) - 1): count for bucket, count in sorted(self.lengths.items())},
+                    'inflects': self.inflects,
+                    'slowest': [(seconds, phrase) for seconds, serial, phrase in sorted(self.slowest, reverse=True)]}
+
+    def clear(self):
+        with self.lock:
+            self.calls = self.inflects = self.serial = 0
+            self.timers = dict()    # stage: [calls, seconds]
+            self.lengths = dict()   # bit length of the input length: calls
+            self.slowest = []       # heap of (seconds, serial, phrase)
+
+    def __init__(self, hook=None, slowest_size=10):
+        self.hook = hook
+        self.slowest_size = slowest_size
+        self.lock = threading.Lock()
+        self.clear()
+
+
+# an Inflect token whose index expression has several morphemes, i.e. which the fixed version decomposes (see decompose_expression())
+decomposed_inflect = re.compile(',Inflect,[^\n]*[+]')
+
+
+# tagger measuring the time in MeCab-ko for PosStats
+class TimedTagger():
+    """Wrapper of a tagger which accumulates the time of Tagger.parse() and Tagger.parseToNode()
+    and counts the Inflect tokens decomposed into several morphemes."""
+
+    def parse(self, text):
+        t = time.perf_counter()
+        result = self.tagger.parse(text)
+        self.elapsed += time.perf_counter() - t
+        self.inflects += len(decomposed_inflect.findall(result))
+        return result
+
+    def parseToNode(self, text):
+        t = time.perf_counter()
+        node = self.tagger.parseToNode(text)
+        t_node = time.perf_counter()
+        self.elapsed += t_node - t
+
+        first = node
+        while node is not None:     # counting on the features of the nodes, which the post-processing walks again
+            if decomposed_inflect.search(node.feature):
+                self.inflects += 1
+            node = node.next
+        self.counting += time.perf_counter() - t_node
+        return first
+
+    def __init__(self, tagger):
+        self.tagger = tagger
+        self.elapsed = 0.0
+        self.counting = 0.0     # the time of counting the Inflect tokens of the nodes, which is not a part of the post-processing
+        self.inflects = 0
+
+
+# timings of the stages of a call of Mecab.pos()
+class PosTimer():
+    """Timings of the stages of one call of Mecab.pos(), recorded into PosStats when the call is done.
+
+    :param stats: The PosStats recording the timings.
+    :param length: The length of the input phrase.
+    """
+
+    def lap(self, stage):
+        # the time since the last lap, as the time of the stage
+        t = time.perf_counter()
+        self.timings[stage] = t - self.t
+        self.t = t
+
+    def tagger(self, tagger):
+        self.timed = TimedTagger(tagger)
+        return self.timed
+
+    def tagged(self, flatten):
+        # the time in MeCab-ko, and the post-processing of its result (the eojeol alignment for flatten=False)
+        t = time.perf_counter()
+        self.timings['tagger'] = self.timed.elapsed
+        self.timings['postprocess' if flatten else 'postprocess_eojeol'] = t - self.t - self.timed.elapsed - self.timed.counting
+        self.t = t
+
+    def done(self, phrase, inflects=True):
+        self.timings['total'] = time.perf_counter() - self.start
+        self.stats.record(self.timings, self.length, self.timed.inflects if inflects and self.timed is not None else 0, phrase)
+
+    def __init__(self, stats, length):
+        self.stats = stats
+        self.length = length
+        self.timings = {}
+        self.timed = None   # TimedTagger of the call, if the tagger is used
+        self.start = self.t = time.perf_counter()
+
+
+# timer of Mecab.pos() without instrumentation
+class NullPosTimer():
+    """PosTimer which measures nothing, used by Mecab.pos() when the instrumentation is off."""
+
+    def lap(self, stage):
+        pass
+
+    def tagger(self, tagger):
+        return tagger
+
+    def tagged(self, flatten):
+        pass
+
+    def done(self, phrase, inflects=True):
+        pass
+
+
+null_pos_timer = NullPosTimer()
+
+
+# integer ids of POS tags
+class TagTable():
+    """Integer ids of POS tags.
+
+    The tags of the tagset get the first ids, and other tags (e.g. VV+EC, UNKNOWN) get new ids when they first appear.
+
+    :param tagset: The tagset of MeCab-ko (e.g. Mecab().tagset).
+    """
+
+    def id(self, tag):
+        try:
+            return self.ids[tag]
+        except KeyError:
+            with self.lock:
+                if tag not in self.ids:
+                    self.tags.append(tag)
+                    self.ids[tag] = len(self.tags) - 1
+                return self.ids[tag]
+
+    def match(self, *patterns):
+        """Ids of the tags matching any of the patterns (e.g. 'NN*', 'VV', 'X?')."""
+
+        return [i for i, tag in enumerate(self.tags) if any(fnmatch.fnmatchcase(tag, pattern) for pattern in patterns)]
+
+    def __getitem__(self, i):
+        return self.tags[i]
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __init__(self, tagset=()):
+        self.tags = list(tagset)    # id: tag
+        self.ids = {tag: i for i, tag in enumerate(self.tags)}  # tag: id
+        self.lock = threading.Lock()
+
+
+# a compact columnar result of a phrase
+class TokenizedDoc():
+    """Compact columnar result of Mecab.pos_doc().
+
+    A document is stored as a few columns instead of lists of tuples:
+    a string of concatenated morphemes with their offsets, the tag ids of the morphemes,
+    and the index of the first morpheme of each eojeol.
+
+    .. code-block:: python
+
+        >>> doc = mecab.pos_doc(u'너를 좋아해.')
+        >>> doc.to_list()
+        [('너', 'NP'), ('를', 'JKO'), ('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')]
+        >>> doc.select('N*', 'VV')
+        ['너', '좋아하']
+    """
+
+    @classmethod
+    def from_nested(cls, pos_result, tag_table):
+        """Build a document from a result of Mecab.pos(flatten=False, join=False)."""
+
+        morphemes = list()
+        tag_ids = array.array('H')
+        offsets = array.array('I', [0])
+        eojeol_offsets = array.array('I', [0])
+        end = 0
+
+        for ej_mor in pos_result:
+            for mor_pos in ej_mor:
+                morphemes.append(mor_pos[0])
+                tag_ids.append(tag_table.id(mor_pos[1]))
+                end += len(mor_pos[0])
+                offsets.append(end)
+            eojeol_offsets.append(len(tag_ids))
+
+        return cls(''.join(morphemes), offsets, tag_ids, eojeol_offsets, tag_table)
+
+    def morpheme(self, i):
+        return self.surfaces[self.offsets[i]:self.offsets[i + 1]]
+
+    def tag(self, i):
+        return self.tag_table[self.tag_ids[i]]
+
+    def to_list(self, join=False):
+        """The flattened result: [(morpheme, POS), ...] (or [morpheme/POS, ...])"""
+
+        return self.slice(0, len(self), join=join)
+
+    def to_nested(self, join=False):
+        """The result grouped by eojeol: [[(morpheme, POS), ...], ...] (or [[morpheme/POS, ...], ...])"""
+
+        return [self.slice(self.eojeol_offsets[i], self.eojeol_offsets[i + 1], join=join) for i in range(len(self.eojeol_offsets) - 1)]
+
+    def slice(self, start, end, join=False):
+        surfaces, offsets, tags, tag_ids = self.surfaces, self.offsets, self.tag_table.tags, self.tag_ids
+        if join:
+            return [surfaces[offsets[i]:offsets[i + 1]] + '/' + tags[tag_ids[i]] for i in range(start, end)]
+        return [(surfaces[offsets[i]:offsets[i + 1]], tags[tag_ids[i]]) for i in range(start, end)]
+
+    def tag_id_array(self):
+        """The tag ids as a NumPy array (without copying)."""
+
+        try:
+            import numpy
+        except ImportError:
+            raise Exception('Install NumPy in order to use it: https://numpy.org/install/')
+        return numpy.frombuffer(self.tag_ids, dtype=numpy.uint16)
+
+    def tag_mask(self, *patterns):
+        """A NumPy boolean mask of the morphemes whose tags match any of the patterns (e.g. 'NN*')."""
+
+        tag_id_array = self.tag_id_array()
+        import numpy    # available, checked by tag_id_array()
+
+        matched = numpy.zeros(len(self.tag_table), dtype=bool)
+        matched[self.tag_table.match(*patterns)] = True
+        return matched[tag_id_array]
+
+    def select(self, *patterns):
+        """The morphemes whose tags match any of the patterns (e.g. 'NN*')."""
+
+        return [self.morpheme(i) for i in self.tag_mask(*patterns).nonzero()[0]]
+
+    def __len__(self):
+        return len(self.tag_ids)
+
+    def __getitem__(self, i):
+        return (self.morpheme(i), self.tag(i))
+
+    def __init__(self, surfaces, offsets, tag_ids, eojeol_offsets, tag_table):
+        self.surfaces = surfaces                # a string of concatenated morphemes
+        self.offsets = offsets                  # the start offset of each morpheme in surfaces, and the end offset
+        self.tag_ids = tag_ids                  # the tag id of each morpheme (see TagTable)
+        self.eojeol_offsets = eojeol_offsets    # the index of the first morpheme of each eojeol, and the number of morphemes
+        self.tag_table = tag_table
+
+
+# binary corpus of tokenized sentences, memory-mapped for random access (see CorpusWriter and CorpusReader)
+# layout: magic | offset of the footer (uint64) | strings | arrays ... | footer (JSON: tags, sections, byte order)
+# each section starts at a multiple of 8 bytes
+corpus_magic = b'MECABKO\x01'
+corpus_sections = [('sentence_bytes', 'Q'),    # the start of each sentence in strings (bytes), and the end
+                   ('offsets', 'I'),           # the start of each morpheme in its sentence (characters)
+                   ('tag_ids', 'H'),           # the tag id of each morpheme (see TagTable)
+                   ('eojeol_offsets', 'I'),    # the index of the first morpheme of each eojeol, and the number of morphemes
+                   ('sentence_offsets', 'I'),  # the index of the first eojeol of each sentence, and the number of eojeols
+                   ('document_offsets', 'I')]  # the index of the first sentence of each document, and the number of sentences
+
+
+class CorpusWriter():
+    """Writer of a binary corpus of tokenized sentences, grouped by document (see CorpusReader).
+
+    The morphemes are written to the file as they are added, and the other columns when it is closed.
+
+    .. code-block:: python
+
+        >>> with CorpusWriter('corpus.bin', mecab.tag_table) as writer:
+        ...     for phrase in document:
+        ...         writer.add(mecab.pos(phrase, flatten=False))
+        ...     writer.end_document()
+
+    :param path: The path of the corpus file.
+    :param tag_table: The TagTable of the tag ids (e.g. Mecab().tag_table).
+    """
+
+    def add(self, pos_result):
+        """Add a sentence: a result of Mecab.pos(flatten=False, join=False) or a TokenizedDoc."""
+
+        doc = pos_result if isinstance(pos_result, TokenizedDoc) else TokenizedDoc.from_nested(pos_result, self.tag_table)
+
+        data = doc.surfaces.encode('utf-8')
+        self.file.write(data)
+        self.columns['sentence_bytes'].append(self.columns['sentence_bytes'][-1] + len(data))
+
+        base = len(self.columns['tag_ids'])
+        self.columns['offsets'].extend(doc.offsets[:-1])
+        if doc.tag_table is self.tag_table:
+            self.columns['tag_ids'].extend(doc.tag_ids)
+        else:
+            self.columns['tag_ids'].extend(self.tag_table.id(doc.tag_table[i]) for i in doc.tag_ids)
+        self.columns['eojeol_offsets'].extend(base + i for i in doc.eojeol_offsets[1:])
+        self.columns['sentence_offsets'].append(len(self.columns['eojeol_offsets']) - 1)
+
+    def end_document(self):
+        """End the current document. The sentences added after it belong to the next document."""
+
+        self.columns['document_offsets'].append(len(self.columns['sentence_offsets']) - 1)
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.columns['document_offsets'][-1] < len(self.columns['sentence_offsets']) - 1:   # the last document
+            self.end_document()
+
+        sections = dict()
+        position = self.file.tell()
+        sections['strings'] = (len(corpus_magic) + 8, position - len(corpus_magic) - 8, 'B')
+        for name, typecode in corpus_sections:
+            position += -position % 8
+            self.file.seek(position)
+            column = self.columns[name]
+            column.tofile(self.file)
+            sections[name] = (position, len(column), typecode)
+            position += len(column) * column.itemsize
+
+        import json
+
+        footer = json.dumps({'tags': self.tag_table.tags, 'sections': sections, 'byteorder': sys.byteorder}, ensure_ascii=False)
+        self.file.write(footer.encode('utf-8'))
+        self.file.seek(len(corpus_magic))
+        self.file.write(position.to_bytes(8, 'little'))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __init__(self, path, tag_table=None):
+        self.tag_table = tag_table if tag_table is not None else TagTable()
+        self.columns = {name: array.array(typecode, [0]) for name, typecode in corpus_sections}
+        self.columns['offsets'] = array.array('I')
+        self.columns['tag_ids'] = array.array('H')
+        self.file = open(path, 'wb')
+        self.file.write(corpus_magic + bytes(8))   # the offset of the footer is written by close()
+
+
+class CorpusReader():
+    """Reader of a binary corpus written by CorpusWriter (or Mecab.write_corpus()).
+
+    The file is memory-mapped, and a sentence is read without deserializing the others.
+
+    .. code-block:: python
+
+        >>> with CorpusReader('corpus.bin') as corpus:
+        ...     corpus.sentence(12345)
+        ...     corpus.sentence(12345, flatten=True, join=True)
+        ...     corpus.document(7)
+        [[('너', 'NP'), ('를', 'JKO')], [('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')]]
+        ['너/NP', '를/JKO', '좋아하/VV', '아/EF', './SF']
+        [[[('너', 'NP'), ...], ...], ...]
+
+    :param path: The path of the corpus file.
+    """
+
+    def doc(self, i):
+        """The i-th sentence as a TokenizedDoc."""
+
+        e_start, e_end = self.sentence_offsets[i], self.sentence_offsets[i + 1]
+        m_start, m_end = self.eojeol_offsets[e_start], self.eojeol_offsets[e_end]
+
+        surfaces = self.strings[self.sentence_bytes[i]:self.sentence_bytes[i + 1]].tobytes().decode('utf-8')
+        offsets = array.array('I')
+        offsets.frombytes(self.offsets[m_start:m_end].cast('B'))
+        offsets.append(len(surfaces))
+        tag_ids = array.array('H')
+        tag_ids.frombytes(self.tag_ids[m_start:m_end].cast('B'))
+        eojeol_offsets = array.array('I', [x - m_start for x in self.eojeol_offsets[e_start:e_end + 1]])
+        return TokenizedDoc(surfaces, offsets, tag_ids, eojeol_offsets, self.tag_table)
+
+    def sentence(self, i, flatten=False, join=False):
+        """The i-th sentence in the shape of Mecab.pos(flatten=..., join=...)."""
+
+        doc = self.doc(i)
+        return doc.to_list(join=join) if flatten else doc.to_nested(join=join)
+
+    def document(self, i, flatten=False, join=False):
+        """The sentences of the i-th document."""
+
+        return [self.sentence(j, flatten=flatten, join=join) for j in self.document_sentences(i)]
+
+    def document_sentences(self, i):
+        """The indices of the sentences of the i-th document."""
+
+        return range(self.document_offsets[i], self.document_offsets[i + 1])
+
+    def close(self):
+        for name in ['strings'] + [name for name, typecode in corpus_sections]:
+            column = getattr(self, name, None)
+            if isinstance(column, memoryview):  # the views of the file must be released before closing it
+                column.release()
+            setattr(self, name, None)
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def __len__(self):
+        return len(self.sentence_offsets) - 1
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError('sentence index out of range')
+        return self.sentence(i % len(self))
+
+    def __iter__(self):
+        return (self.sentence(i) for i in range(len(self)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __init__(self, path):
+        import json
+        import mmap
+
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[:len(corpus_magic)] != corpus_magic:
+            self.mmap.close()
+            raise Exception('"%s" is not a corpus file of CorpusWriter.' % path)
+
+        view = memoryview(self.mmap)
+        footer = json.loads(self.mmap[int.from_bytes(self.mmap[len(corpus_magic):len(corpus_magic) + 8], 'little'):].decode('utf-8'))
+        self.tag_table = TagTable(footer['tags'])
+        for name, (position, length, typecode) in footer['sections'].items():
+            column = view[position:position + length * array.array(typecode).itemsize].cast(typecode)
+            if footer['byteorder'] != sys.byteorder:    # copying the columns in the byte order of this machine
+                swapped = array.array(typecode)
+                swapped.frombytes(column.tobytes())
+                swapped.byteswap()
+                column.release()
+                column = memoryview(swapped)    # a memoryview like the columns of the file, for doc()
+            setattr(self, name, column)
+        view.release()
+        self.document_count = len(self.document_offsets) - 1
+
+
+# vocabulary of (morpheme, POS) with integer ids, for encoding phrases into NumPy arrays (see Encoder)
+class Vocabulary():
+    """Frequency-counted vocabulary of (morpheme, POS).
+
+    New (morpheme, POS)s get the next ids while the vocabulary grows, so the ids already issued never change.
+    freeze() prunes rare ones and stops the growth: the unknown ones get the id of <unk> (0).
+
+    :param tokens: (morpheme, POS)s in the order of their ids, after <unk>.
+    :param counts: Their frequencies.
+    """
+
+    unk = ('<unk>', '')     # the id 0
+
+    @classmethod
+    def load(cls, path):
+        """Load a frozen vocabulary saved by save()."""
+
+        tokens = []
+        counts = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                morpheme, tag, count = line.rstrip('\n').split('\t')
+                tokens.append((morpheme, tag))
+                counts.append(int(count))
+        vocabulary = cls(tokens[1:], counts[1:])
+        vocabulary.counts[0] = counts[0]
+        vocabulary.frozen = True
+        return vocabulary
+
+    def save(self, path):
+        """Save the vocabulary as 'morpheme<TAB>POS<TAB>count' lines in the order of the ids."""
+
+        with open(path, 'w', encoding='utf-8') as f:
+            for (morpheme, tag), count in zip(self.tokens, self.counts):
+                f.write('%s\t%s\t%d\n' % (morpheme, tag, count))
+
+    def add(self, mor_pos, count=1):
+        """Count a (morpheme, POS) and return its id (the id of <unk> for an unknown one of a frozen vocabulary)."""
+
+        i = self.ids.get(mor_pos)
+        if i is None:
+            if self.frozen:
+                return 0
+            i = self.ids[mor_pos] = len(self.tokens)
+            self.tokens.append(mor_pos)
+            self.counts.append(0)
+        self.counts[i] += count
+        return i
+
+    def id(self, mor_pos):
+        return self.ids.get(mor_pos, 0)
+
+    def token(self, i, join=False):
+        return '/'.join(self.tokens[i]) if join else self.tokens[i]
+
+    def freeze(self, min_count=1, max_size=None):
+        """Stop the growth, keeping the (morpheme, POS)s counted at least min_count times (at most max_size of them, the most frequent).
+
+        Returns an array of the new id of each old id (e.g. new_ids = mapping[old_ids] for NumPy arrays) if some are pruned, else None.
+        """
+
+        self.frozen = True
+        kept = [i for i in range(1, len(self.tokens)) if self.counts[i] >= min_count]
+        if max_size is not None and len(kept) > max_size - 1:
+            kept = sorted(sorted(kept, key=self.counts.__getitem__, reverse=True)[:max_size - 1])
+        if len(kept) == len(self.tokens) - 1:
+            return None
+
+        mapping = array.array('i', bytes(4 * len(self.tokens)))  # the pruned ones become <unk>
+        for new, old in enumerate(kept, 1):
+            mapping[old] = new
+        self.counts[0] += sum(self.counts[i] for i in range(1, len(self.tokens))) - sum(self.counts[i] for i in kept)
+        self.tokens = [self.unk] + [self.tokens[i] for i in kept]
+        self.counts = self.counts[:1] + [self.counts[i] for i in kept]
+        self.ids = {mor_pos: i for i, mor_pos in enumerate(self.tokens)}
+        self.version += 1
+        return mapping
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __contains__(self, mor_pos):
+        return mor_pos in self.ids
+
+    def __init__(self, tokens=(), counts=None):
+        self.tokens = [self.unk] + list(tokens)     # id: (morpheme, POS)
+        self.counts = [0] + (list(counts) if counts is not None else [0] * (len(self.tokens) - 1))
+        self.ids = {mor_pos: i for i, mor_pos in enumerate(self.tokens)}   # (morpheme, POS): id
+        self.frozen = False
+        self.version = 0    # incremented when the ids change (by freeze())
+
+
+# one-pass encoder of phrases into integer ids
+class Encoder():
+    """Encoder of phrases into NumPy int32 arrays of vocabulary ids, counting the vocabulary in the same pass.
+
+    .. code-block:: python
+
+        >>> encoder = Encoder(mecab)
+        >>> ids, eojeol_offsets = encoder.encode(u'너를 좋아해.')
+        >>> ids, eojeol_offsets
+        (array([1, 2, 3, 4, 5], dtype=int32), array([0, 2, 5], dtype=int32))
+        >>> encoder.vocabulary.save('vocab.tsv')   # later: Encoder(mecab, Vocabulary.load('vocab.tsv'))
+
+    :param mecab: A Mecab instance.
+    :param vocabulary: A Vocabulary. A new one grows by default.
+    :param maxsize: The maximum number of distinct lines of MeCab-ko whose ids are kept.
+    """
+
+    def encode(self, phrase):
+        """The ids of the morphemes of a phrase, and the index of the first morpheme of each eojeol (and the number of morphemes)."""
+
+        try:
+            import numpy
+        except ImportError:
+            raise Exception('Install NumPy in order to use it: https://numpy.org/install/')
+
+        mecab, vocabulary = self.mecab, self.vocabulary
+        ids = array.array('i')
+        eojeol_offsets = array.array('i', [0])
+
+        if not mecab.can_parse_raw():
+            for ej_mor in mecab.pos(phrase, flatten=False, join=False, coda_normalization=self.coda_normalization):
+                ids.extend(vocabulary.add(mor_pos) for mor_pos in ej_mor)
+                eojeol_offsets.append(len(ids))
+            return numpy.frombuffer(ids, dtype=numpy.int32), numpy.frombuffer(eojeol_offsets, dtype=numpy.int32)
+
+        # the fixed version from the analysed result, without building (morpheme, POS)s for the lines encoded before
+        if self.version != vocabulary.version:
+            self.line_ids.clear()
+            self.version = vocabulary.version
+
+        phrase, result = mecab.parse_raw(phrase)
+        line_ids, counts, frozen = self.line_ids, vocabulary.counts, vocabulary.frozen
+
+        def split_line(elem):
+            entry = line_ids.get(elem)
+            if entry is None:
+                if elem:
+                    s, t = elem.split('\t')
+                    entry = (tuple(vocabulary.add(mor_pos, count=0) for mor_pos in split_fixed(s, t, coda_normalization=self.coda_normalization,
+                                                                                            decompositions=mecab.decompositions)), s.strip())
+                else:   # an unanalyzable character
+                    entry = ((vocabulary.add(('', 'SY'), count=0),), '')
+                if len(line_ids) < self.maxsize:
+                    line_ids[elem] = entry
+            if not frozen:
+                for i in entry[0]:
+                    counts[i] += 1
+            return entry
+
+        for token_ids in iter_eojeols(result, phrase, split_line):
+            ids.extend(token_ids)
+            eojeol_offsets.append(len(ids))
+        return numpy.frombuffer(ids, dtype=numpy.int32), numpy.frombuffer(eojeol_offsets, dtype=numpy.int32)
+
+    def encode_many(self, phrases):
+        """Encode a stream of phrases (see encode())."""
+
+        for phrase in phrases:
+            yield self.encode(phrase)
+
+    def decode(self, ids, join=False):
+        return [self.vocabulary.token(i, join=join) for i in ids]
+
+    def __init__(self, mecab, vocabulary=None, coda_normalization=True, maxsize=100000):
+        self.mecab = mecab
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self.coda_normalization = coda_normalization
+        self.maxsize = maxsize
+        self.line_ids = dict()  # a line of MeCab-ko (e.g. 좋아해\tVV+EF,...): (the ids of its morphemes, its surface)
+        self.version = self.vocabulary.version
+
+
+# function for splitting a text into sentences for IncrementalAnalyzer: the start offset of each sentence.
+# A sentence ends after a sentence ender followed by a blank, or after a newline, so no eojeol is split.
+# Where a sentence ends depends only on the characters around it, so an edited text is split again only around the edit
+sentence_boundary = re.compile(chunk_sentence_end.pattern + '|\n')
+
+
+def split_sentences(text):
+    return [0] + [m.end() for m in sentence_boundary.finditer(text) if m.end() < len(text)]
+
+
+# the change of the eojeols of IncrementalAnalyzer by an edit: eojeols[start:stop] are replaced by the new eojeols
+Splice = collections.namedtuple('Splice', ['start', 'stop', 'eojeols'])
+
+
+# a Fenwick (binary indexed) tree of non-negative numbers, for prefix sums in O(log n)
+class FenwickTree():
+    def add(self, i, delta):
+        i += 1
+        while i <= len(self.tree) - 1:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        # the sum of the first i numbers
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def search(self, value):
+        # the largest i such that the sum of the first i numbers is at most value
+        i = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if i + step < len(self.tree) and self.tree[i + step] <= value:
+                i += step
+                value -= self.tree[i]
+            step >>= 1
+        return i
+
+    def __init__(self, values=()):
+        self.tree = [0] + list(values)
+        for i in range(1, len(self.tree)):  # building in O(n)
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+
+# sentences (text, eojeols) of IncrementalAnalyzer in blocks, with the numbers of sentences, characters and eojeols
+# of the blocks in Fenwick trees, so that a sentence is found by its index or offset and replaced in O(log n + block size)
+class SentenceBlocks():
+    block_size = 64
+
+    def locate(self, offset):
+        # the index of the sentence containing the offset (the last one for the end of the text), and its start offset
+        b = min(self.chars.search(offset), len(self.blocks) - 1)
+        index = self.counts.prefix(b)
+        start = self.chars.prefix(b)
+        block = self.blocks[b]
+        for k in range(len(block) - 1):
+            if offset < start + len(block[k][0]):
+                return index + k, start
+            start += len(block[k][0])
+        return index + len(block) - 1, start
+
+    def find(self, i):
+        # (block, index in the block) of the i-th sentence
+        b = self.counts.search(i)
+        return b, i - self.counts.prefix(b)
+
+    def start(self, i):
+        b, k = self.find(i)
+        return self.chars.prefix(b) + sum(len(text) for text, result in self.blocks[b][:k])
+
+    def eojeol_index(self, i):
+        # the number of eojeols before the i-th sentence
+        b, k = self.find(i)
+        return self.eojeols.prefix(b) + sum(len(result) for text, result in self.blocks[b][:k])
+
+    def slice(self, first, last):
+        # the sentences first..last
+        b, k = self.find(first)
+        items = []
+        while len(items) < last - first + 1:
+            items += self.blocks[b][k:k + last - first + 1 - len(items)]
+            b, k = b + 1, 0
+        return items
+
+    def replace(self, first, last, items):
+        # replacing the sentences first..last with items
+        b1, k1 = self.find(first)
+        b2, k2 = self.find(last)
+        merged = self.blocks[b1][:k1] + items + self.blocks[b2][k2 + 1:]
+        count = b2 - b1 + 1
+        if count <= len(merged) <= 2 * self.block_size * count:     # keeping the number of blocks
+            new_blocks = [merged[len(merged) * i // count:len(merged) * (i + 1) // count] for i in range(count)]
+        else:
+            new_blocks = [merged[i:i + self.block_size] for i in range(0, len(merged), self.block_size)]
+        totals = [self.block_totals(block) for block in new_blocks]
+
+        if len(new_blocks) == count:
+            for b, (sentences, chars, eojeols) in enumerate(totals, b1):
+                old_sentences, old_chars, old_eojeols = self.totals[b]
+                self.counts.add(b, sentences - old_sentences)
+                self.chars.add(b, chars - old_chars)
+                self.eojeols.add(b, eojeols - old_eojeols)
+        self.blocks[b1:b2 + 1] = new_blocks
+        self.totals[b1:b2 + 1] = totals
+        if len(new_blocks) != count:    # rare: many sentences are added or removed at once
+            self.build()
+
+    def block_totals(self, block):
+        return (len(block), sum(len(text) for text, result in block), sum(len(result) for text, result in block))
+
+    def build(self):
+        self.counts = FenwickTree(sentences for sentences, chars, eojeols in self.totals)
+        self.chars = FenwickTree(chars for sentences, chars, eojeols in self.totals)
+        self.eojeols = FenwickTree(eojeols for sentences, chars, eojeols in self.totals)
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.blocks)
+
+    def __len__(self):
+        return self.counts.prefix(len(self.blocks))
+
+    def __init__(self, items):
+        items = list(items)     # at least one sentence (split_sentences() gives one for an empty text)
+        self.blocks = [items[i:i + self.block_size] for i in range(0, len(items), self.block_size)]
+        self.totals = [self.block_totals(block) for block in self.blocks]   # (sentences, characters, eojeols) of each block
+        self.build()
+
+
+# analyser of a text being edited, which analyses again only the sentences around each edit
+class IncrementalAnalyzer():
+    """Eojeol-grouped result of pos(flatten=False) of a text, kept sentence by sentence and updated by edits.
+
+    The sentences are analysed one by one, so the result equals that of pos(flatten=False) of the whole text
+    unless MeCab-ko (or a replacement rule) analyses differently across the ends of sentences, as with pos(max_chunk_chars=...).
+    edit() analyses again the sentences it touches and one sentence on each side (whose ends may move).
+    The sentences are kept in blocks with their numbers of characters and eojeols in Fenwick trees (see SentenceBlocks),
+    so an edit costs O(size of the edit + log(number of sentences)) besides building the new text when it is read.
+    update() also compares the two versions of the text to find the edit, which is linear but done in C (see common_affix_lengths()).
+
+    .. code-block:: python
+
+        >>> analyzer = IncrementalAnalyzer(mecab, u'너를 좋아해. 들어간다.')
+        >>> analyzer.update(u'너를 좋아해. 나간다.')
+        Splice(start=0, stop=3, eojeols=[[('너', 'NP'), ('를', 'JKO')], [('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')], [('나가', 'VV'), ('ㄴ다', 'EF'), ('.', 'SF')]])
+        >>> analyzer.eojeols()
+        [[('너', 'NP'), ('를', 'JKO')], [('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')], [('나가', 'VV'), ('ㄴ다', 'EF'), ('.', 'SF')]]
+
+    :param mecab: A Mecab instance.
+    :param text: The first version of the text.
+    """
+
+    def update(self, text):
+        """Replace the text with a new version. The edited range is the part between their common prefix and suffix."""
+
+        old_text = self.text
+        prefix, suffix = common_affix_lengths(old_text, text)
+        splice = self.edit(prefix, len(old_text) - suffix, text[prefix:len(text) - suffix])
+        self._text = text
+        return splice
+
+    def edit(self, start, end, replacement):
+        """Replace text[start:end] with the replacement, and return the change of the eojeols (see Splice)."""
+
+        length = self.sentence_blocks.chars.prefix(len(self.sentence_blocks.blocks))
+        if not 0 <= start <= end <= length:
+            raise Exception('Invalid range of the edit: %d-%d (the text has %d characters)' % (start, end, length))
+
+        # the sentences touched by the edit, and one sentence on each side
+        blocks = self.sentence_blocks
+        first, region_start = blocks.locate(start)
+        if first > 0:
+            first -= 1
+            region_start -= len(blocks.slice(first, first)[0][0])
+        last = min(blocks.locate(end)[0] + 1, len(blocks) - 1)
+        old_items = blocks.slice(first, last)
+
+        region = ''.join(text for text, result in old_items)
+        region = region[:start - region_start] + replacement + region[end - region_start:]
+        offsets = split_sentences(region)
+        items = [(region[offset:stop], self.analyse(region[offset:stop])) for offset, stop in zip(offsets, offsets[1:] + [len(region)])]
+
+        eojeol_start = blocks.eojeol_index(first)
+        eojeol_stop = eojeol_start + sum(len(result) for text, result in old_items)
+        blocks.replace(first, last, items)
+        self._text = None
+        return Splice(eojeol_start, eojeol_stop, list(itertools.chain.from_iterable(result for text, result in items)))
+
+    def analyse(self, sentence):
+        return self.mecab.pos(sentence, flatten=False, join=self.join, coda_normalization=self.coda_normalization)
+
+    @property
+    def text(self):
+        if self._text is None:  # built on first read after edits
+            self._text = ''.join(text for text, result in self.sentence_blocks)
+        return self._text
+
+    def eojeols(self):
+        """The eojeols of the whole text."""
+
+        return list(itertools.chain.from_iterable(result for text, result in self.sentence_blocks))
+
+    def sentences(self):
+        """(start offset, end offset, eojeols) of each sentence."""
+
+        sentences = []
+        start = 0
+        for text, result in self.sentence_blocks:
+            sentences.append((start, start + len(text), result))
+            start += len(text)
+        return sentences
+
+    def __init__(self, mecab, text='', join=False, coda_normalization=True):
+        self.mecab = mecab
+        self.join = join
+        self.coda_normalization = coda_normalization
+        offsets = split_sentences(text)
+        self.sentence_blocks = SentenceBlocks((text[start:end], self.analyse(text[start:end])) for start, end in zip(offsets, offsets[1:] + [len(text)]))
+        self._text = text
+
+
+# the original and the fixed results of Mecab.pos_dual(), and whether each eojeol is analysed differently by them
+DualResult = collections.namedtuple('DualResult', ['original', 'fixed', 'differs'])
+
+
+# taggers shared by the Mecab instances of a process, e.g. the instances unpickled in every task on Spark/Dask
+shared_pools = dict()   # (dicpath, pool size, backend): TaggerPool. RecordBackend and ReplayBackend are equal for the same file
+shared_pools_lock = threading.Lock()
+shared_pools_pid = None # the process which created shared_pools. A forked process creates its own taggers
+
+
+def get_shared_pool(dicpath, size=1, backend='mecab-python3'):
+    global shared_pools_pid
+
+    with shared_pools_lock:
+        if shared_pools_pid != os.getpid():
+            shared_pools.clear()
+            shared_pools_pid = os.getpid()
+
+        key = (dicpath, size, backend)
+        if key not in shared_pools:
+            factory = get_backend(backend)
+            shared_pools[key] = TaggerPool(lambda: factory(dicpath), size=size)
+        return shared_pools[key]
+
+
+# function for loading the tagset of MeCab-ko once per process
+@functools.lru_cache(maxsize=None)
+def load_tagset():
+    from konlpy import utils
+    return utils.read_json('%s/data/tagset/mecab.json' % utils.installpath)
+
+
+# functions for the worker processes of Mecab.pos_corpus()
+_corpus_worker = None       # a Mecab instance built once per worker process
+_corpus_pos_kwargs = {}     # arguments of Mecab.pos()
+
+
+def _init_corpus_worker(state, pos_kwargs):
+    global _corpus_worker, _corpus_pos_kwargs
+    _corpus_worker = Mecab(**state)
+    _corpus_pos_kwargs = pos_kwargs
+
+
+def _pos_corpus_chunk(chunk):
+    return [_corpus_worker.pos(phrase, **_corpus_pos_kwargs) for phrase in chunk]
+
+
 ######################## the original code ##############################
 # class Mecab():
 #     """Wrapper for MeCab-ko morphological analyzer.
@@ -256,175 +2259,539 @@ class Mecab():
         [('자연', 'NNG'), ('주', 'NNG'), ('의', 'JKG'), ('쇼핑몰', 'NNG'), ('은', 'JX'), ('어떤', 'MM'), ('곳', 'NNG'), ('인가', 'VCP+EF'), ('?', 'SF')]
 
     :param dicpath: The path of the MeCab-ko dictionary.
+    :param use_original: If True, uses the original version of KoNLPy.
+    :param use_node: If True, walks the nodes of MeCab-ko (``Tagger.parseToNode``) instead of parsing its analysed string.
+    :param pool_size: The maximum number of taggers shared by threads. A tagger is used by only one thread at a time.
+    :param cache_size: The maximum number of results of pos() kept in an LRU cache. The cache is disabled by default.
+    :param cache_bytes: The maximum (approximate) memory size of the cached results in bytes.
+    :param lazy: If True, the tagger and the tagset are built on first use (or by warmup()), not in the constructor.
+    :param shared: If True, the taggers are shared with the other instances of the process which have the same dicpath and pool_size.
+        An unpickled instance is always shared, so that a worker process builds its taggers only once.
+    :param instrument: If True, pos() keeps timings and counters of its stages (see stats()).
+    :param stats_hook: A function called with the timings of every call of pos() (implies instrument=True). It is not pickled.
+    :param backend: The binding of MeCab-ko: 'mecab-python3' (MeCab), 'python-mecab-ko' (mecab), RecordBackend, ReplayBackend
+        or a function creating a tagger (an object with parse(text) returning the analysed result of MeCab-ko) from the dictionary path.
+    :param replace_rules: Replacements (old, new) of the phrase before the analysis, e.g. for known mis-analyses,
+        or the path of a file of 'old<TAB>new' lines. They are applied after the default ones, all in a single scan (see ReplaceRules).
+        The eojeols of pos(flatten=False) are those of the replaced phrase, and pos_spans() maps them back to the original phrase.
+    :param decomposition_size: The maximum number of decomposed Inflect tokens kept for the fixed version (see DecompositionCache). 0 disables it.
+    :param disk_cache: The path of an SQLite database of the results of pos(), shared by processes and kept across runs (see DiskCache).
+        The results are keyed by the phrase, the options and a fingerprint of the dictionary (see dictionary_fingerprint()),
+        so they are analysed again when the dictionary is changed. pos_many() looks them up in batches.
 
     .. _MeCab: https://code.google.com/p/mecab/
     .. _Eunjeon Project: http://eunjeon.blogspot.kr/
     """
 
 
-    # TODO: check whether flattened results equal non-flattened
-    def pos(self, phrase, flatten=True, join=False, coda_normalization=True):
-        if self.use_original == False:  # If we use the fixed version
-            """POS tagger.
+    def pos(self, phrase, flatten=True, join=False, coda_normalization=True, max_chunk_chars=None):
+        """POS tagger.
+
+        :param flatten: If False, preserves eojeols.
+        :param join: If True, returns joined sets of morph and tag.
+        :param coda_normalization: If True, converts final consonant characters (e.g. ᆫ) into ordinary ones (e.g. ㄴ). Only for the fixed version.
+        :param max_chunk_chars: If given, a longer phrase is analysed in chunks of at most this many characters, which end
+            before a blank (preferably after a sentence, then at a newline), so the memory is bounded by the size of a chunk.
+            The results of the chunks are concatenated (the eojeols of flatten=False continue across them),
+            and equal the result of the whole phrase unless MeCab-ko analyses differently across the ends of the chunks.
+        """
+
+        if max_chunk_chars is not None and max_chunk_chars < 1:
+            raise Exception('max_chunk_chars must be a positive number of characters: %r' % (max_chunk_chars,))
+        if max_chunk_chars is not None and len(phrase) > max_chunk_chars:
+            return self._pos_chunked(phrase, max_chunk_chars, flatten=flatten, join=join, coda_normalization=coda_normalization)
+        timer = PosTimer(self.pos_stats, len(phrase)) if self.pos_stats is not None else null_pos_timer
+        phrase = self._preprocess(phrase)
+        timer.lap('preprocess')
+
+        if self.cache is not None:
+            key = (phrase, flatten, join, coda_normalization, self.use_original)
+            cached = self.cache.get(key)
+            timer.lap('cache')
+            if cached is not None:  # copying the cached result so that callers cannot corrupt it
+                pos_result = list(cached) if flatten else [list(ej_mor) for ej_mor in cached]
+                timer.done(phrase)
+                return pos_result
+
+        pos_result = None
+        if self.disk_cache is not None:
+            disk_key = self._disk_key(phrase, flatten, join, coda_normalization)
+            pos_result = self.disk_cache.get(disk_key)
+            timer.lap('disk_cache')
+
+        if pos_result is None:
+            tagger = self.pool.acquire()    # a tagger which is not used by other threads
+            try:
+                timer.lap('wait')   # waiting for an idle tagger
+                pos_result = self._pos(timer.tagger(tagger), phrase, flatten=flatten, join=join, coda_normalization=coda_normalization)
+                timer.tagged(flatten)
+            finally:
+                self.pool.release(tagger)
+            if self.disk_cache is not None:
+                self.disk_cache.put(disk_key, pos_result)
+
+        if self.cache is not None:
+            self.cache.put(key, tuple(pos_result) if flatten else tuple(tuple(ej_mor) for ej_mor in pos_result))
+
+        timer.done(phrase, inflects=not self.use_original)
+        return pos_result
+
+    def _pos_chunked(self, phrase, max_chunk_chars, flatten=True, join=False, coda_normalization=True):
+        # pos() of a long phrase, chunk by chunk. The replacements are done for the whole phrase (they may cross the ends of the chunks)
+        phrase = self._preprocess(phrase)
+
+        pos_result = []
+        tagger = self.pool.acquire()
+        try:
+            for chunk in split_chunks(phrase, max_chunk_chars):
+                pos_result += self._pos(tagger, chunk, flatten=flatten, join=join, coda_normalization=coda_normalization)
+        finally:
+            self.pool.release(tagger)
+        return pos_result
 
-            :param flatten: If False, preserves eojeols.
-            :param join: If True, returns joined sets of morph and tag.
-            """
+    async def apos(self, phrase, flatten=True, join=False, coda_normalization=True):
+        """Asynchronous version of pos().
 
-            # replacing for exceptions
-            # phrase = phrase.replace('\u3000', ' ')  # replacing ideographic spaces into blanks
-            # phrase = phrase.replace('영치기 영차', '영치기영차')   # a temporary solution for '영치기 영차'. '영치기 영차' consists of 2 eojeols. However, MeCab-ko analyses it as 1 eojeol. I haven't figured out the reason yet.
-            phrase = replace_multiple(string=phrase, replace_list=[('\u3000', ' '), ('영치기 영차', '영치기영차')])
+        The analysis runs on a dedicated thread pool whose threads share the taggers of the pool,
+        so the event loop is not blocked. The number of concurrent analyses is limited by the size of the tagger pool.
+        A cancelled call is dropped before it starts if it is still waiting for its turn.
+        """
 
+        return await self._run_async(lambda: self.pos(phrase, flatten=flatten, join=join, coda_normalization=coda_normalization))
 
-            # self = Mecab()
-            if sys.version_info[0] >= 3: # for Python 3
-                result = self.tagger.parse(phrase)  # an analysed result of a phrase (or a sentence) (e.g. 이게 뭔지 알아. > 이게\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*\n뭔지\tNP+VCP+EC,*,F,뭔지,Inflect,NP,EC,뭐/NP/*+이/VCP/*+ㄴ지/EC/*\n알\tVV,*,T,알,*,*,*,*\n아\tEF,*,F,아,*,*,*,*\n.\tSF,*,*,*,*,*,*,*\nEOS\n)
+    async def amorphs(self, phrase):
+        """Asynchronous version of morphs()."""
 
+        return await self._run_async(lambda: self.morphs(phrase))
 
-                if flatten: # flatten = True. If you want to get a flattened (2-D) result: [(morpheme, POS), ...]
-                                # e.g.
-                                # [('이것', 'NP'),
-                                # ('이', 'JKS'),
-                                # ('뭐', 'NP'),
-                                # ('이', 'VCP'),
-                                # ('ㄴ지', 'EC'),
-                                # ('알', 'VV'),
-                                # ('아', 'EF'),
-                                # ('.', 'SF')])
+    async def anouns(self, phrase):
+        """Asynchronous version of nouns()."""
 
-                    # converting final consonant characters to ordinary single characters
-                    # result = result.replace("ᆯ", "ㄹ").replace("ᆫ", "ㄴ").replace("ᄇ", "ㅂ").replace("ᆼ", "ㅇ")
+        return await self._run_async(lambda: self.nouns(phrase))
 
+    async def apos_many(self, phrases, flatten=True, join=False, coda_normalization=True):
+        """Asynchronous POS tagger for a stream of phrases.
 
-                    result = hangul_unicode_correction(parsed=result)
+        An async iterator which yields the results in the order of the phrases,
+        keeping only as many analyses in flight as the size of the tagger pool.
 
+        .. code-block:: python
 
-                    if coda_normalization == False:
-                        pass
-                    elif coda_normalization == True:
-                        result = replace_multiple(string=result, replace_list=[("ᆫ", "ㄴ"), ("ᆯ", "ㄹ"), ("ᄆ", "ㅁ"), ("ᄇ", "ㅂ"), ("ᆼ", "ㅇ")])
+            >>> async for pos_result in mecab.apos_many(phrases):
+            ...     print(pos_result)
 
-                    return parse_fixed(result, join=join)
+        :param phrases: An iterable or an async iterable of phrases.
+        """
 
-                else:   # flatten = False. If you want to get a 3-D result: [ [ (morpheme, POS), (morpheme, POS), ... ], ... ]
-        #                     # e.g.
-        #                     # [[('이것', 'NP'), ('이', 'JKS')],
-        #                     # [('뭐', 'NP'), ('이', 'VCP'), ('ᆫ지', 'EC')],
-        #                     # [('알', 'VV'), ('아', 'EF'), ('.', 'SF')]]
-        #
-                    ## 1) analysed result of Mecab-ko
-                    result_mor_lst = result.splitlines()[:-1]
-                    # example of 'result_mor_lst'
-                    # ['이게\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*',
-                    # '뭔지\tNP+VCP+EC,*,F,뭔지,Inflect,NP,EC,뭐/NP/*+이/VCP/*+ㄴ지/EC/*',
-                    # '알\tVV,*,T,알,*,*,*,*',
-                    # '아\tEF,*,F,아,*,*,*,*',
-                    # '.\tSF,*,*,*,*,*,*,*']
+        import asyncio
 
+        async def iter_phrases():
+            if hasattr(phrases, '__aiter__'):
+                async for phrase in phrases:
+                    yield phrase
+            else:
+                for phrase in phrases:
+                    yield phrase
 
-                    # troubleshooting an unanalyzable character: 
-                    result_mor_lst = [x if x != "" else '\tSY,*,*,*,*,*,*,*' for x in result_mor_lst ]
+        pending = collections.deque()   # tasks in the order of the phrases
+        try:
+            async for phrase in iter_phrases():
+                pending.append(asyncio.ensure_future(self.apos(phrase, flatten=flatten, join=join, coda_normalization=coda_normalization)))
+                if len(pending) >= self.pool.size:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:    # e.g. when the iteration is stopped or cancelled
+                task.cancel()
+
+    async def _run_async(self, func):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        semaphore = self.async_semaphores.get(loop)     # a semaphore is bound to the event loop which first waits on it
+        if semaphore is None:
+            semaphore = self.async_semaphores[loop] = asyncio.Semaphore(self.pool.size)
+        with self.init_lock:
+            if self.executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self.executor = ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix='mecab')
+            executor = self.executor
+
+        async with semaphore:
+            return await loop.run_in_executor(executor, func)
+
+    def close(self, wait=True):
+        """Shut down the threads of apos() (and the others of the asynchronous methods).
+
+        The instance is still usable: the threads are started again by the next asynchronous call.
+
+        :param wait: If True, waits for the running analyses to finish.
+        """
+
+        with self.init_lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def iter_pos(self, lines, flatten=True, join=False, coda_normalization=True):
+        """POS tagger for a stream of phrases, e.g. a file object.
+
+        Yields the result of each line lazily, so that the whole input is never held in memory.
+
+        :param lines: An iterable of phrases (e.g. a file object). Trailing newlines are removed.
+        """
+
+        for line in lines:
+            yield self.pos(line.rstrip('\r\n'), flatten=flatten, join=join, coda_normalization=coda_normalization)
+
+    def pos_spans(self, phrase, flatten=True, join=False, coda_normalization=True):
+        """POS tagger which also returns the character offsets of morphemes and eojeols in the phrase.
+
+        The offsets are found by a single scan over the phrase, and the morphemes are grouped into eojeols
+        in the same way as pos(flatten=False) (see iter_eojeols()). A morpheme decomposed from an Inflect token
+        (e.g. 좋아하 + 아 from 좋아해) gets the span of the token. A morpheme whose surface is not found in the phrase
+        (e.g. an unanalyzable character, whose surface is empty) gets None, and so does an eojeol of such morphemes only.
+
+        .. code-block:: python
+
+            >>> mecab.pos_spans(u'너를 좋아해.')
+            ([('너', 'NP'), ('를', 'JKO'), ('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')],
+             [(0, 1), (1, 2), (3, 6), (3, 6), (6, 7)],
+             [(0, 2), (3, 7)])
+
+        :returns: (the result of pos(), (start, end) of each morpheme in the same shape, (start, end) of each eojeol)
+        """
+
+        text, origin = self.replace_rules.replace_offsets(phrase)
+        cursor = [0]    # offset in 'text' after the last surface found
+
+        def locate(s):
+            # the span of a surface in the phrase, searched from the cursor (None if it is not found)
+            if not s:
+                return None
+            position = cursor[0]
+            while position < len(text) and text[position].isspace() and not text.startswith(s, position):    # skipping whitespace (including '\u3000')
+                position += 1
+            start = text.find(s, position, position + 2 * len(s) + 8)  # searching only near the cursor to keep the scan linear
+            if start < 0:
+                return None
+            cursor[0] = start + len(s)
+            return origin[start], origin[start + len(s) - 1] + 1
+
+        def spans_of(s, t):
+            span = locate(s)
+            if self.use_original:
+                mor_info = [s + '/' + t.split(',', 1)[0] if join else (s, t.split(',', 1)[0])]
+            else:
+                mor_info = split_fixed(s, t, join=join, coda_normalization=coda_normalization, decompositions=self.decompositions)
+            return [(mor_pos, span) for mor_pos in mor_info]
 
+        unanalyzable = ([('/SY' if join else ('', 'SY'), None)], '')
 
-                    ## 2) adding indices of eojeols to result_mor_lst
-                    phrase2ej = phrase.split()  # eojeol list # ['먹을', '수', '있다']
-                    cnt = 0 # index of an eojeol
-                    concat_mor = ""
+        def split_line(elem):
+            if not elem:
+                return unanalyzable
+            s, t = elem.split('\t')
+            return spans_of(s, t), s.strip()
 
-                    for i in range(len(result_mor_lst)):
-                        info_str = result_mor_lst[i].split("\t")[0].strip() # '너\tNP,*,F,너,*,*,*,*'   >   '너'
+        tagger = self.pool.acquire()
+        try:
+            if self.use_node:   # the nodes are grouped by whitespace, as pos() does with use_node=True
+                ej_lst = group_node((s, spans_of(s, t), spaced) for s, t, spaced in iter_node(tagger.parseToNode(text)))
+            else:
+                ej_lst = list(iter_eojeols(tagger.parse(text), text, split_line))
+        finally:
+            self.pool.release(tagger)
 
-                        concat_mor += info_str  # concatenating morphemes until the string is equal to their original eojeol (e.g. 알 > 알+았 > 알+았+어요)
+        pos_result = [[mor_pos for mor_pos, span in ej_mor] for ej_mor in ej_lst]
+        spans = [[span for mor_pos, span in ej_mor] for ej_mor in ej_lst]
+        eojeol_spans = []
+        for ej_span in spans:
+            found = [span for span in ej_span if span is not None]
+            eojeol_spans.append((found[0][0], found[-1][1]) if found else None)
 
-                        if concat_mor == phrase2ej[cnt]:    # If the string of concatenated morphemes is equal to its original eojeol
-                            result_mor_lst[i] += "," + str(cnt) # adding the index (cnt) of the eojeol
-                            cnt += 1
-                            concat_mor = ""
-                        else:
-                            result_mor_lst[i] += "," + str(cnt) # adding the index (cnt) of the eojeol
-                    # example of 'result_mor_lst'
-                    # ['이게\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*,0',   # add an eojeol index (',0')
-                    # '뭔지\tNP+VCP+EC,*,F,뭔지,Inflect,NP,EC,뭐/NP/*+이/VCP/*+ㄴ지/EC/*,1',
-                    # '알\tVV,*,T,알,*,*,*,*,2',
-                    # '아\tEF,*,F,아,*,*,*,*,2',
-                    # '.\tSF,*,*,*,*,*,*,*,2']
+        if flatten:
+            return list(itertools.chain.from_iterable(pos_result)), list(itertools.chain.from_iterable(spans)), eojeol_spans
+        return pos_result, spans, eojeol_spans
 
+    def pos_doc(self, phrase, coda_normalization=True):
+        """POS tagger returning a compact columnar result (see TokenizedDoc).
 
-                    ## 3) splitting the result_mor_lst by morpheme for the case when the string of concatenated morphmese is not equal to their original eojeol (e.g. 뭔지 != 뭐 + 이 + ㄴ지)
-                    for i in range(len(result_mor_lst)):
-                        splited = result_mor_lst[i].split(",")
+        .. code-block:: python
 
-                        if splited[4] == 'Inflect': # If an eojeol is Inflect (= a concatenation of morphemes is not equal to its original eojeol. (e.g. 뭔지 != 뭐 + 이 + ㄴ지)
-                            mors = [x.split('/')[0] for x in splited[7].split('+')]
-                            for_replace = list()
+            >>> doc = mecab.pos_doc(u'너를 좋아해.')
+            >>> doc.to_nested()
+            [[('너', 'NP'), ('를', 'JKO')], [('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')]]
+        """
 
-                            for j in range(len(mors)):
-                                for_replace += [ mors[j] + '\t' + result_mor_lst[i].split('\t')[-1]]
+        return TokenizedDoc.from_nested(self.pos(phrase, flatten=False, join=False, coda_normalization=coda_normalization), self.tag_table)
 
-                            result_mor_lst[i] = for_replace
-        # split a token anlaysis string by morpheme
-        # '좋아해\tVV+EF,*,F,좋아해,Inflect,VV,EF,좋아하/VV/*+아/EF/*,1'   >    # ['좋아하\tVV+EF,*,F,좋아해,Inflect,VV,EF,좋아하/VV/*+아/EF/*,1',
-        #                                                                 # '아\tVV+EF,*,F,좋아해,Inflect,VV,EF,좋아하/VV/*+아/EF/*,1']
+    def pos_dual(self, phrase, flatten=True, join=False, coda_normalization=True):
+        """POS tagger returning both the original and the fixed results from a single analysis of MeCab-ko (see DualResult).
 
-                        else:   # If an eojeol consists of 1 morpheme
-                            result_mor_lst[i] = [result_mor_lst[i]] # convert to a list (e.g. '너\tNP,*,F,너,*,*,*,*,0'  >  ['너\tNP,*,F,너,*,*,*,*,0'])
+        The results equal those of pos() with use_original=True and False. The phrase is analysed twice only if the replacements
+        of the two versions change it differently (e.g. a phrase with ideographic spaces). The caches are not used.
+        differs has a flag for each eojeol of the fixed result, whether the original version analyses it differently.
 
-                    # flatten the list of lists to a 1-D list
-                    result_mor_lst = list(itertools.chain.from_iterable(result_mor_lst))
+        .. code-block:: python
 
-                    # example of result_mor_lst
-                    # ['이게\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*,0',                    ['이것\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*,0',
-                    #                                                                             '이\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*,0',
-                    # '뭔지\tNP+VCP+EC,*,F,뭔지,Inflect,NP,EC,뭐/NP/*+이/VCP/*+ㄴ지/EC/*,1',            '뭐\tNP+VCP+EC,*,F,뭔지,Inflect,NP,EC,뭐/NP/*+이/VCP/*+ㄴ지/EC/*,1',
-                    #                                                                         >     '이\tNP+VCP+EC,*,F,뭔지,Inflect,NP,EC,뭐/NP/*+이/VCP/*+ㄴ지/EC/*,1',
-                    #                                                                             'ㄴ지\tNP+VCP+EC,*,F,뭔지,Inflect,NP,EC,뭐/NP/*+이/VCP/*+ㄴ지/EC/*,1',
-                    # '알\tVV,*,T,알,*,*,*,*,2',                                                     '알\tVV,*,T,알,*,*,*,*,2',
-                    # '아\tEF,*,F,아,*,*,*,*,2',                                                     '아\tEF,*,F,아,*,*,*,*,2',
-                    # '.\tSF,*,*,*,*,*,*,*,2']                                                      '.\tSF,*,*,*,*,*,*,*,2']
+            >>> mecab.pos_dual(u'너를 좋아해.', flatten=False)
+            DualResult(original=[[('너', 'NP'), ('를', 'JKO')], [('좋아해', 'VV+EF'), ('.', 'SF')]],
+                       fixed=[[('너', 'NP'), ('를', 'JKO')], [('좋아하', 'VV'), ('아', 'EF'), ('.', 'SF')]],
+                       differs=[False, True])
 
+        :param coda_normalization: Only for the fixed result.
+        """
 
-                    ## 4) saving the 3-D (unflattened) result:    [ [ (morpheme, POS), (morpheme, POS), ... ], ... ]
-                    parsed_mor = parse_fixed( hangul_unicode_correction( parsed=self.tagger.parse(phrase) ) , join=join)  # 2-D (flattened) result: [ (morpheme, POS), ...]
+        if self.dual_replace_rules is None:    # the replacements of the original and the fixed versions
+            if self.use_original:
+                self.dual_replace_rules = (self.replace_rules, ReplaceRules([('\u3000', ' ')] + self.replace_list))
+            else:
+                self.dual_replace_rules = (ReplaceRules(self.replace_list[1:]), self.replace_rules)
+        original_phrase = self.dual_replace_rules[0].replace(phrase)
+        fixed_phrase = self.dual_replace_rules[1].replace(phrase)
 
-                    pos_result = list() # list for the final result: 3-D (unflattened) list
-                    cnt = 0 # index for a morpheme
+        tagger = self.pool.acquire()
+        try:
+            results = {original_phrase: tagger.parse(original_phrase)}
+            if fixed_phrase != original_phrase:
+                results[fixed_phrase] = tagger.parse(fixed_phrase)
+        finally:
+            self.pool.release(tagger)
+        replay = ReplayTagger(results)  # the analysed results for the post-processing of both versions
 
-                    for i in range(len(phrase2ej)):
-                        ej_mor = list() # list for an 2-D (flattened) eojeol list: [(morpheme, POS), ...]
+        fixed = self._pos(replay, fixed_phrase, flatten=False, join=join, coda_normalization=coda_normalization, use_original=False, use_node=False)
+        # the eojeols of the original version aligned like those of the fixed one (pos(flatten=False) of the original version may misalign them)
+        original_eojeols = parse_eojeol(results[original_phrase], original_phrase, join=join)
+        differs = [i >= len(original_eojeols) or original_eojeols[i] != ej_fixed for i, ej_fixed in enumerate(fixed)]
+        if len(original_eojeols) > len(fixed) and differs:  # morphemes of the original version left after the last eojeol
+            differs[-1] = True
 
-                        while i == int( result_mor_lst[cnt].split(",")[-1]):  # While the index of a morpheme is equal to the index of an eojeol
-                            if cnt > len(parsed_mor)-1:
-                                break
+        original = self._pos(replay, original_phrase, flatten=flatten, join=join, use_original=True, use_node=False)
+        if flatten:
+            fixed = list(itertools.chain.from_iterable(fixed))
+        return DualResult(original, fixed, differs)
 
-                            ej_mor.append(parsed_mor[cnt])  # adding a (morpheme, POS) to ej_mor
-                            cnt += 1
+    def pos_tokens(self, phrase, flatten=True, coda_normalization=True):
+        """POS tagger returning Tokens, which also have the other features of MeCab-ko (see Token).
 
-                            if cnt == len(result_mor_lst): # If cnt is equal to the length of a phrase (or sentence)
-                                break
+        The morphemes and tags equal those of pos(). The eojeols of flatten=False are aligned as in the fixed version. The caches are not used.
 
-                        pos_result.append(ej_mor) # adding the 2-D (flattened) list of an eojeol to the final 3-D (unflattened) list
+        .. code-block:: python
 
+            >>> [(token.surface, token.tag, token.source) for token in mecab.pos_tokens(u'좋아해')]
+            [('좋아하', 'VV', 좋아해/VV+EF), ('아', 'EF', 좋아해/VV+EF)]
+        """
 
-                    if join == False:
-                        if coda_normalization == False:
-                            pos_result = [[(mor_pos[0], mor_pos[1]) for mor_pos in word] for word in pos_result]
-                        elif coda_normalization == True:
-                            pos_result = [ [( replace_multiple(string=mor_pos[0], replace_list=[("ᆫ", "ㄴ"), ("ᆯ", "ㄹ"), ("ᄆ", "ㅁ"), ("ᄇ", "ㅂ"), ("ᆼ", "ㅇ")]), mor_pos[1]) for mor_pos in word] for word in pos_result]
+        phrase, result = self.parse_raw(phrase)
+        return parse_tokens(result, phrase, flatten=flatten, use_original=self.use_original, coda_normalization=coda_normalization, decompositions=self.decompositions)
 
-                    elif join == True:
-                        if coda_normalization == False:
-                            pos_result = [[mor_pos for mor_pos in word] for word in pos_result]
-                        elif coda_normalization == True:
-                            pos_result = [ [ replace_multiple(string=mor_pos, replace_list=[("ᆫ", "ㄴ"), ("ᆯ", "ㄹ"), ("ᄆ", "ㅁ"), ("ᄇ", "ㅂ"), ("ᆼ", "ㅇ")]) for mor_pos in word] for word in pos_result]
+    def write_corpus(self, path, documents, coda_normalization=True):
+        """Analyse documents into a binary corpus file, which CorpusReader reads with random access.
 
+        :param documents: Documents, each of which is a list of phrases (or a single phrase).
+        """
 
-                    return pos_result
+        with CorpusWriter(path, self.tag_table) as writer:
+            for document in documents:
+                for phrase in ([document] if isinstance(document, str) else document):
+                    writer.add(self.pos(phrase, flatten=False, join=False, coda_normalization=coda_normalization))
+                writer.end_document()
 
-                    # example of pos_result
-                    # [[('이것', 'NP'), ('이', 'JKS')],
-                    # [('뭐', 'NP'), ('이', 'VCP'), ('ᆫ지', 'EC')],
-                    # [('알', 'VV'), ('아', 'EF'), ('.', 'SF')]]
+    def cache_info(self):
+        """Statistics of the result cache (hits, misses, evictions, size, maxsize, bytes, maxbytes)."""
+
+        return self.cache.info() if self.cache is not None else None
+
+    def cache_clear(self):
+        """Clear the result cache."""
+
+        if self.cache is not None:
+            self.cache.clear()
+
+    def disk_cache_info(self):
+        """Statistics of the disk cache (hits and misses of this process, and the number of entries of the dictionary)."""
+
+        return self.disk_cache.info() if self.disk_cache is not None else None
+
+    def stats(self):
+        """Timings and counters of pos() since the last reset_stats(), if the instance is created with instrument=True.
+
+        - calls: the number of calls.
+        - stages: the number of calls, the cumulative seconds and the mean seconds of each stage
+          (preprocess, cache, wait for a tagger, tagger, postprocess or postprocess_eojeol, total).
+        - lengths: a histogram of the input lengths in characters.
+        - inflects: the number of Inflect tokens decomposed into several morphemes (0 for the original version).
+        - slowest: (seconds, phrase) of the slowest inputs.
+        """
+
+        return self.pos_stats.snapshot() if self.pos_stats is not None else None
+
+    def reset_stats(self):
+        """Reset the timings and counters of pos()."""
+
+        if self.pos_stats is not None:
+            self.pos_stats.clear()
+
+    def decomposition_info(self):
+        """Statistics of the decomposed Inflect tokens (hits, misses, size, maxsize)."""
+
+        return self.decompositions.info() if self.decompositions is not None else None
+
+    def warm_decompositions(self, features, options=None):
+        """Decompose the most frequent Inflect tokens in advance (see DecompositionCache.warm())."""
+
+        if self.decompositions is not None:
+            self.decompositions.warm(features, options=options)
+
+    def pos_many(self, phrases, flatten=True, join=False, coda_normalization=True, workers=None):
+        """POS tagger for a batch of phrases.
+
+        The phrases are analysed by threads which share the taggers of the pool,
+        and the results are returned in the order of the phrases.
+
+        :param workers: The number of threads. The default is the size of the tagger pool.
+        """
+
+        if workers is None:
+            workers = self.pool.size
+
+        if self.disk_cache is not None:
+            return self._pos_many_cached(phrases, flatten=flatten, join=join, coda_normalization=coda_normalization, workers=workers)
+
+        if workers <= 1:
+            return [self.pos(phrase, flatten=flatten, join=join, coda_normalization=coda_normalization) for phrase in phrases]
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda phrase: self.pos(phrase, flatten=flatten, join=join, coda_normalization=coda_normalization), phrases))
+
+    def _pos_many_cached(self, phrases, flatten=True, join=False, coda_normalization=True, workers=1):
+        # pos_many() looking up and storing the results of the disk cache in batches
+        phrases = [self._preprocess(phrase) for phrase in phrases]
+        disk_keys = [self._disk_key(phrase, flatten, join, coda_normalization) for phrase in phrases]
+        pos_results = self.disk_cache.get_many(disk_keys)
+        missing = [i for i, pos_result in enumerate(pos_results) if pos_result is None]
+
+        def analyse(i):
+            tagger = self.pool.acquire()
+            try:
+                return self._pos(tagger, phrases[i], flatten=flatten, join=join, coda_normalization=coda_normalization)
+            finally:
+                self.pool.release(tagger)
+
+        if workers <= 1 or len(missing) <= 1:
+            analysed = [analyse(i) for i in missing]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                analysed = list(executor.map(analyse, missing))
+
+        for i, pos_result in zip(missing, analysed):
+            pos_results[i] = pos_result
+        if missing:
+            self.disk_cache.put_many([(disk_keys[i], pos_results[i]) for i in missing])
+        return pos_results
+
+    def _disk_key(self, phrase, flatten, join, coda_normalization):
+        # the key of a (preprocessed) phrase in the disk cache. The dictionary is told apart by the fingerprint of DiskCache.
+        # use_node is a part of the key, since the node path groups eojeols by whitespace, which may differ for flatten=False
+        return '%s\0%d%d%d%d%d\0%s' % (self.backend_name, self.use_original, self.use_node, flatten, join, coda_normalization, phrase)
+
+    def pos_corpus(self, phrases, processes=None, chunksize=500, max_pending=None, **pos_kwargs):
+        """POS tagger for a large corpus, using worker processes.
+
+        The worker processes are started once and build their own Mecab with the same arguments.
+        Phrases are sent to them in chunks, and the results are yielded in the order of the phrases.
+
+        :param phrases: An iterable of phrases (e.g. a file object).
+        :param processes: The number of worker processes. The default is the number of CPUs.
+        :param chunksize: The number of phrases sent to a worker at once.
+        :param max_pending: The maximum number of chunks in flight, which bounds the memory usage. The default is twice the number of processes.
+        :param pos_kwargs: Arguments of pos() (e.g. flatten=False, join=True).
+        """
+
+        import multiprocessing
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if max_pending is None:
+            max_pending = 2 * processes
+
+        phrases = iter(phrases)
+        pending = collections.deque()   # results of the chunks in flight, in the order of the phrases
+        exhausted = False
+
+        with multiprocessing.Pool(processes, initializer=_init_corpus_worker, initargs=(self.__getstate__(), pos_kwargs)) as pool:
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    chunk = list(itertools.islice(phrases, chunksize))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    pending.append(pool.apply_async(_pos_corpus_chunk, (chunk,)))
+
+                if not pending:
+                    break
+
+                yield from pending.popleft().get()
+
+    def _preprocess(self, phrase):
+        # replacing for exceptions
+        return self.replace_rules.replace(phrase)
+
+    # TODO: check whether flattened results equal non-flattened
+    def _pos(self, tagger, phrase, flatten=True, join=False, coda_normalization=True, use_original=None, use_node=None):
+        # use_original, use_node: overriding those of the instance (e.g. for pos_dual())
+        if use_original is None:
+            use_original = self.use_original
+        if use_node is None:
+            use_node = self.use_node
+
+        if use_original == False:  # If we use the fixed version
+            """POS tagger.
+
+            :param flatten: If False, preserves eojeols.
+            :param join: If True, returns joined sets of morph and tag.
+            """
+
+            # phrase: replaced for exceptions by _preprocess()
+
+            # self = Mecab()
+            if use_node:   # walking the nodes of MeCab-ko instead of parsing its analysed string
+                pos_result = parse_fixed_node(tagger.parseToNode(phrase), join=join, coda_normalization=coda_normalization, decompositions=self.decompositions)
+                return list(itertools.chain.from_iterable(pos_result)) if flatten else pos_result
+
+            if sys.version_info[0] >= 3: # for Python 3
+                result = tagger.parse(phrase)  # an analysed result of a phrase (or a sentence) (e.g. 이게 뭔지 알아. > 이게\tNP+JKS,*,F,이게,Inflect,NP,JKS,이것/NP/*+이/JKS/*\n뭔지\tNP+VCP+EC,*,F,뭔지,Inflect,NP,EC,뭐/NP/*+이/VCP/*+ㄴ지/EC/*\n알\tVV,*,T,알,*,*,*,*\n아\tEF,*,F,아,*,*,*,*\n.\tSF,*,*,*,*,*,*,*\nEOS\n)
+
+
+                if flatten: # flatten = True. If you want to get a flattened (2-D) result: [(morpheme, POS), ...]
+                                # e.g.
+                                # [('이것', 'NP'),
+                                # ('이', 'JKS'),
+                                # ('뭐', 'NP'),
+                                # ('이', 'VCP'),
+                                # ('ㄴ지', 'EC'),
+                                # ('알', 'VV'),
+                                # ('아', 'EF'),
+                                # ('.', 'SF')])
+
+                    # hangul_unicode_correction(), the coda normalization and parse_fixed() in a single pass
+                    return list(iter_parse_fixed(result, join=join, coda_normalization=coda_normalization, decompositions=self.decompositions))
+
+                else:   # flatten = False. If you want to get a 3-D result: [ [ (morpheme, POS), (morpheme, POS), ... ], ... ]
+                                # e.g.
+                                # [[('이것', 'NP'), ('이', 'JKS')],
+                                # [('뭐', 'NP'), ('이', 'VCP'), ('ㄴ지', 'EC')],
+                                # [('알', 'VV'), ('아', 'EF'), ('.', 'SF')]]
+
+                    # grouping morphemes by eojeol from the single analysed result above (no second call of self.tagger.parse())
+                    return parse_fixed_eojeol(result, phrase=phrase, join=join, coda_normalization=coda_normalization, decompositions=self.decompositions)
 
 
         #     else: # There is no code for Python 2. I strongly recommend you to use Python 3.
@@ -444,19 +2811,23 @@ class Mecab():
             :param join: If True, returns joined sets of morph and tag.
             """
 
-            phrase = phrase.replace('영치기 영차', '영치기영차')   # a temporary solution for '영치기 영차'. '영치기 영차' consists of 2 eojeols. However, MeCab-ko analyses it as 1 eojeol. I haven't figured out the reason yet.
+            # phrase: replaced for exceptions by _preprocess()
+
+            if use_node:   # walking the nodes of MeCab-ko instead of parsing its analysed string
+                pos_result = parse_node(tagger.parseToNode(phrase), join=join)
+                return list(itertools.chain.from_iterable(pos_result)) if flatten else pos_result
 
             if sys.version_info[0] < 3:
                 phrase = phrase.encode('utf-8')
                 if flatten:
-                    result = self.tagger.parse(phrase).decode('utf-8')
+                    result = tagger.parse(phrase).decode('utf-8')
                     return parse(result, join=join)
                 else:
-                    return [parse(self.tagger.parse(eojeol).decode('utf-8'), join=join)
+                    return [parse(tagger.parse(eojeol).decode('utf-8'), join=join)
                             for eojeol in phrase.split()]
             else:
                 if flatten:
-                    result = self.tagger.parse(phrase)
+                    result = tagger.parse(phrase)
                     return parse(result, join=join)
                 else:
                     # return [parse(self.tagger.parse(eojeol), join=join)
@@ -465,7 +2836,7 @@ class Mecab():
                     # flatten fixed 2021-09-26
 
                     ## 1) analysed result of Mecab-ko
-                    result = self.tagger.parse(phrase)
+                    result = tagger.parse(phrase)
                     result_mor_lst = result.splitlines()[:-1]
                     # example of result_mor_lst'
                     # ['너\tNP,*,F,너,*,*,*,*',
@@ -498,7 +2869,7 @@ class Mecab():
 
 
                     ## 3) saving the 3-D (unflattened) result:    [ [ (morpheme, POS), (morpheme, POS), ... ], ... ]
-                    parsed_mor = parse(self.tagger.parse(phrase), join=join)  # 2-D (flattened) result: [ (morpheme, POS), ...]
+                    parsed_mor = parse(tagger.parse(phrase), join=join)  # 2-D (flattened) result: [ (morpheme, POS), ...]
 
                     pos_result = list() # list for the final result: 3-D (unflattened) list
                     cnt = 0  # index for a morpheme
@@ -523,35 +2894,211 @@ class Mecab():
                     # [[('너', 'NP'), ('를', 'JKO')], [('좋아해', 'VV+EF'), ('.', 'SF')]]
 
 
+    def pos_filter(self, phrase, include_tags=None, exclude_tags=None, stopwords=None, min_len=0, join=False, coda_normalization=True, morpheme_filter=None):
+        """POS tagger returning only the morphemes which pass a filter (flattened).
+
+        The filter is applied while parsing the analysed result, after the decomposition of Inflect tokens,
+        so the dropped morphemes are never built.
+
+        .. code-block:: python
+
+            >>> mecab.pos_filter(u'영등포구청역에 있는 맛집 좀 알려주세요.', include_tags=['NN*', 'VV', 'VA', 'XR'], min_len=2)
+            [('영등포구청역', 'NNP'), ('맛집', 'NNG'), ('알리', 'VV')]
+
+        :param include_tags: Patterns of the tags kept (e.g. 'NN*', 'VV'). The default is all the tags. An empty list keeps none.
+        :param exclude_tags: Patterns of the tags dropped.
+        :param stopwords: Morphemes dropped.
+        :param min_len: The minimum length of the morphemes kept.
+        :param morpheme_filter: A MorphemeFilter compiled in advance, instead of the arguments above.
+        """
+
+        accept = morpheme_filter if morpheme_filter is not None else MorphemeFilter(include_tags, exclude_tags, stopwords, min_len)
+
+        if not self.can_parse_raw():
+            return [x for x in self.pos(phrase, join=join, coda_normalization=coda_normalization)
+                    if accept(*(x.rsplit('/', 1) if join else x[:2]))]
+
+        phrase, result = self.parse_raw(phrase)
+        return list(iter_filter_fixed(result, accept, join=join, coda_normalization=coda_normalization, decompositions=self.decompositions))
+
+    def parse_raw(self, phrase):
+        """The replaced phrase (see replace_rules) and the analysed result of MeCab-ko for it, e.g. for building results directly."""
+
+        phrase = self._preprocess(phrase)
+        tagger = self.pool.acquire()
+        try:
+            return phrase, tagger.parse(phrase)
+        finally:
+            self.pool.release(tagger)
+
+    def can_parse_raw(self):
+        """Whether a method may build its result from the analysed result of MeCab-ko directly (e.g. pos_filter(), Encoder),
+        i.e. the fixed version parsing strings, with none of the caches and the instrumentation which pos() would use."""
+
+        return not (self.use_original or self.use_node or self.cache is not None or self.disk_cache is not None or self.pos_stats is not None)
+
     def morphs(self, phrase):
         """Parse phrase to morphemes."""
 
-        return [s for s, t in self.pos(phrase)]
+        return [x[0] for x in self.pos_filter(phrase, morpheme_filter=morphs_filter)]
 
     def nouns(self, phrase):
         """Noun extractor."""
 
-        tagged = self.pos(phrase)
-        return [s for s, t in tagged if t.startswith('N')]
-
-    def __init__(self, dicpath='/usr/local/lib/mecab/dic/mecab-ko-dic', use_original=False):
+        return [x[0] for x in self.pos_filter(phrase, morpheme_filter=nouns_filter)]
+
+    def warmup(self):
+        """Build the tagger and load the tagset now, instead of on first use (see lazy)."""
+
+        if self._tagset is None:
+            with self.init_lock:
+                if self._tagset is None:
+                    self._tagger = self.pool.acquire()  # the first tagger of the pool
+                    self.pool.release(self._tagger)
+                    tagset = load_tagset()
+                    self._tag_table = TagTable(tagset)  # integer ids of the tags for TokenizedDoc
+                    self._tagset = tagset
+        return self
+
+    @property
+    def tagger(self):
+        if self._tagger is None:
+            self.warmup()
+        return self._tagger
+
+    @property
+    def tagset(self):
+        if self._tagset is None:
+            self.warmup()
+        return self._tagset
+
+    @property
+    def tag_table(self):
+        if self._tag_table is None:
+            self.warmup()
+        return self._tag_table
+
+    def __init__(self, dicpath='/usr/local/lib/mecab/dic/mecab-ko-dic', use_original=False, use_node=False, pool_size=1, cache_size=None, cache_bytes=None, lazy=False, shared=False, instrument=False, stats_hook=None, backend='mecab-python3', replace_rules=None, decomposition_size=10000, disk_cache=None):
         self.use_original = use_original    # whether to use the original version
+        self.use_node = use_node    # whether to walk the nodes of MeCab-ko (Tagger.parseToNode()) instead of parsing its analysed string
+
+        # replacing for exceptions before the analysis
+        self.replace_list = [('영치기 영차', '영치기영차')]    # a temporary solution for '영치기 영차'. '영치기 영차' consists of 2 eojeols. However, MeCab-ko analyses it as 1 eojeol. I haven't figured out the reason yet.
+        if not use_original:
+            self.replace_list.insert(0, ('\u3000', ' '))  # replacing ideographic spaces into blanks
+        if isinstance(replace_rules, str):  # the path of a file of rules
+            replace_rules = ReplaceRules.from_file(replace_rules).rules
+        self.user_replace_rules = list(replace_rules or ())
+        self.replace_list += self.user_replace_rules
+        self.replace_rules = ReplaceRules(self.replace_list)    # all the rules applied in a single scan
+        self.dual_replace_rules = None  # the rules of the original and the fixed versions for pos_dual(), created on first use
+
+        self.cache = ResultCache(maxsize=cache_size, maxbytes=cache_bytes) if cache_size or cache_bytes else None  # results of pos()
+        self.pos_stats = PosStats(hook=stats_hook) if instrument or stats_hook is not None else None    # timings and counters of pos()
+        self.decompositions = DecompositionCache(decomposition_size) if decomposition_size else None  # decomposed Inflect tokens
+        self.disk_cache_path = disk_cache
+        self.disk_cache = DiskCache(disk_cache, fingerprint=dictionary_fingerprint(dicpath)) if disk_cache else None   # results of pos() on disk
 
         self.dicpath = dicpath
-        try:
-            self.tagger = Tagger('-d %s' % dicpath)
-            self.tagset = utils.read_json('%s/data/tagset/mecab.json' % utils.installpath)
-        except RuntimeError:
-            raise Exception('The MeCab dictionary does not exist at "%s". Is the dictionary correctly installed?\nYou can also try entering the dictionary path when initializing the Mecab class: "Mecab(\'/some/dic/path\')"' % dicpath)
-        except NameError:
-            raise Exception('Install MeCab in order to use it: http://konlpy.org/en/latest/install/')
+        self.lazy = lazy    # whether to build the tagger and load the tagset on first use
+        self.shared = shared    # whether to share the taggers with the other instances of the process
+        self.backend = backend  # the binding of MeCab-ko
+        self.backend_name = backend if isinstance(backend, str) else getattr(backend, '__name__', type(backend).__name__)
+        if shared:
+            self.pool = get_shared_pool(dicpath, size=pool_size, backend=backend)
+        else:
+            factory = get_backend(backend)
+            self.pool = TaggerPool(lambda: factory(dicpath), size=pool_size)   # taggers shared by threads
+        self.executor = None            # threads for apos(), created on first use
+        self.async_semaphores = weakref.WeakKeyDictionary()    # limiting the number of concurrent apos(), one for each event loop
+        self.init_lock = threading.Lock()
+        self._tagger = self._tagset = self._tag_table = None
+
+        if not lazy:
+            self.warmup()
 
     def __setstate__(self, state):
-        """just reinitialize."""
+        """reinitialize, reusing the taggers of the process for the same arguments."""
 
-        self.__init__(dicpath=state['dicpath'])
+        self.__init__(**dict(state, shared=True))
 
     def __getstate__(self):
         """store arguments."""
 
-        return {'dicpath': self.dicpath}
+        return {'dicpath': self.dicpath, 'use_original': self.use_original, 'use_node': self.use_node, 'pool_size': self.pool.size,
+                'cache_size': self.cache.maxsize if self.cache is not None else None,
+                'cache_bytes': self.cache.maxbytes if self.cache is not None else None,
+                'lazy': self.lazy, 'shared': self.shared, 'instrument': self.pos_stats is not None,
+                'backend': self.backend, 'replace_rules': self.user_replace_rules,
+                'decomposition_size': self.decompositions.maxsize if self.decompositions is not None else 0,
+                'disk_cache': self.disk_cache_path}
+
+
+# function for writing a result of Mecab.pos() in the output format of the command-line tokenizer
+def format_result(pos_result, output_format='text', flatten=True, join=False):
+    # pos_result: a result of Mecab.pos()
+    # text : 너/NP 를/JKO 좋아하/VV 아/EF ./SF (flatten=False: 너/NP+를/JKO 좋아하/VV+아/EF+./SF)
+    # tsv  : a morpheme per line (너\tNP), with the index of its eojeol if flatten=False (0\t너\tNP), and an empty line after a phrase
+    # jsonl: a JSON array per line
+
+    if output_format == 'jsonl':
+        import json
+        return json.dumps(pos_result, ensure_ascii=False) + '\n'
+
+    ej_lst = [pos_result] if flatten else pos_result
+    if join:
+        ej_lst = [[mor_pos.rpartition('/')[::2] for mor_pos in ej_mor] for ej_mor in ej_lst]  # '너/NP' > ('너', 'NP')
+
+    if output_format == 'tsv':
+        return ''.join(('' if flatten else str(i) + '\t') + mor_pos[0] + '\t' + mor_pos[1] + '\n'
+                       for i, ej_mor in enumerate(ej_lst) for mor_pos in ej_mor) + '\n'
+
+    return ' '.join((' ' if flatten else '+').join(mor_pos[0] + '/' + mor_pos[1] for mor_pos in ej_mor) for ej_mor in ej_lst) + '\n'
+
+
+# command-line tokenizer: python -m konlpy.tag._mecab [files ...] < input > output
+def main(argv=None):
+    import argparse
+    import io
+
+    parser = argparse.ArgumentParser(description='POS-tag each line of the files (or stdin) with MeCab-ko, and write the results to stdout.')
+    parser.add_argument('files', nargs='*', help='input files (default: stdin)')
+    parser.add_argument('-d', '--dicpath', default='/usr/local/lib/mecab/dic/mecab-ko-dic', help='the path of the MeCab-ko dictionary')
+    parser.add_argument('-f', '--format', dest='output_format', choices=['text', 'tsv', 'jsonl'], default='text', help='the output format (default: text)')
+    parser.add_argument('--no-flatten', dest='flatten', action='store_false', help='preserve eojeols')
+    parser.add_argument('--join', action='store_true', help='join morphemes and tags (jsonl)')
+    parser.add_argument('--no-coda-normalization', dest='coda_normalization', action='store_false', help='keep final consonant characters (e.g. ᆫ)')
+    parser.add_argument('--use-original', action='store_true', help='use the original version of KoNLPy')
+    parser.add_argument('--use-node', action='store_true', help='walk the nodes of MeCab-ko instead of parsing its analysed string')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='mecab-python3', help='the binding of MeCab-ko (default: mecab-python3)')
+    parser.add_argument('--processes', type=int, default=0, help='the number of worker processes (default: no worker process)')
+    parser.add_argument('--encoding', default='utf-8', help='the encoding of the input and the output (default: utf-8)')
+    args = parser.parse_args(argv)
+
+    mecab = Mecab(dicpath=args.dicpath, use_original=args.use_original, use_node=args.use_node, backend=args.backend)
+    pos_kwargs = dict(flatten=args.flatten, join=args.join, coda_normalization=args.coda_normalization)
+
+    def iter_lines():
+        if not args.files:
+            yield from io.TextIOWrapper(sys.stdin.buffer, encoding=args.encoding)
+        for path in args.files:
+            with io.open(path, encoding=args.encoding) as f:
+                yield from f
+
+    if args.processes > 0:
+        results = mecab.pos_corpus((line.rstrip('\r\n') for line in iter_lines()), processes=args.processes, **pos_kwargs)
+    else:
+        results = mecab.iter_pos(iter_lines(), **pos_kwargs)
+
+    sys.stdout.flush()
+    out = io.open(sys.stdout.fileno(), 'w', encoding=args.encoding, buffering=1 << 16, closefd=False)  # buffered writes
+    try:
+        for pos_result in results:
+            out.write(format_result(pos_result, args.output_format, flatten=args.flatten, join=args.join))
+        out.flush()
+    except BrokenPipeError:     # e.g. piped to head
+        sys.stderr.close()
+
+
+if __name__ == '__main__':
+    main()
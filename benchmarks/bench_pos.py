@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+# throughput and latency benchmark of Mecab.pos() for every combination of use_original, flatten, join and coda_normalization
+# on a synthetic Korean corpus (short queries, long paragraphs, Inflect-heavy text, text with 　 and jamo)
+# the time of each call is split into the time in MeCab-ko (Tagger.parse()) and the time of the post-processing in Python
+#
+# usage: python benchmarks/bench_pos.py [--dicpath DICPATH] [--backend BACKEND] [--size N] [--kind KIND] [--record FILE | --replay FILE] [--json FILE]
+#
+# --backend compares the bindings of MeCab-ko. --record FILE saves the analysed results of MeCab-ko for the corpus,
+# and --replay FILE runs the benchmark on a stand-in tagger returning them (_mecab.ReplayBackend),
+# so that it works on machines without MeCab-ko and mecab-ko-dic
+
+
+from __future__ import print_function
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))     # the directory of _mecab.py
+sys.path.insert(0, ROOT)
+
+import _mecab
+
+
+# words of the synthetic corpus
+NOUNS = [u'서울', u'날씨', u'학교', u'친구', u'영화', u'회사', u'정부', u'경제', u'대통령', u'국회', u'법률', u'시장', u'가격', u'사람', u'아이',
+         u'책', u'음식', u'버스', u'지하철', u'병원', u'컴퓨터', u'프로그램', u'데이터', u'형태소', u'분석기', u'문제', u'결과', u'오늘', u'내일']
+PARTICLES = [u'이', u'가', u'은', u'는', u'을', u'를', u'에', u'에서', u'으로', u'와', u'과', u'의', u'도', u'만', u'까지', u'부터']
+PREDICATES = [u'간다', u'갔다', u'했다', u'한다', u'했어요', u'봤는데', u'먹었다', u'좋아해', u'알아', u'몰라요', u'됐다', u'왔어', u'줬다',
+              u'있다', u'없었다', u'크다', u'작았다', u'예뻐요', u'싫어해', u'들어간다']
+INFLECTS = [u'이건', u'그건', u'뭔지', u'이게', u'난', u'넌', u'걘', u'내가', u'네가', u'했어', u'봤어', u'줬는데', u'갔었지', u'됐어',
+            u'해봤다', u'먹어봤어', u'뭐예요', u'거예요', u'건데', u'할걸', u'했잖아']
+QUERIES = [u'서울 맛집', u'날씨', u'오늘 날씨 알려줘', u'지하철 노선도', u'환율', u'영화 추천', u'근처 병원', u'형태소 분석기', u'내일 비',
+           u'버스 시간표']
+SPECIALS = [u'ㅋㅋㅋ', u'ㅎㅎ', u'ㅠㅠ', u'ㄱㄱ', u'ㄴㄴ', u'ㅇㅇ', u'　', u'영치기 영차', u'ᄀᆞ', u'ᆫ', u'ᆯ', u'좋아ㅋ', u'간다']
+ENDINGS = [u'.', u'.', u'.', u'?', u'!', u'...']
+
+
+# functions for generating the sentences of the synthetic corpus
+def make_sentence(rng, inflect=0.2, special=0.0):
+    words = []
+    for _ in range(rng.randint(2, 6)):
+        if rng.random() < inflect:
+            words.append(rng.choice(INFLECTS))
+        else:
+            words.append(rng.choice(NOUNS) + rng.choice(PARTICLES))
+        if rng.random() < special:
+            words.append(rng.choice(SPECIALS))
+    words.append(rng.choice(PREDICATES) + rng.choice(ENDINGS))
+    return u' '.join(words)
+
+
+def make_text(rng, kind):
+    if kind == 'short':
+        return rng.choice(QUERIES) if rng.random() < 0.5 else u' '.join(rng.choice(NOUNS) for _ in range(rng.randint(1, 3)))
+    elif kind == 'long':
+        return u' '.join(make_sentence(rng) for _ in range(rng.randint(8, 15)))
+    elif kind == 'inflect':
+        return u' '.join(make_sentence(rng, inflect=0.8) for _ in range(rng.randint(1, 3)))
+    elif kind == 'special':
+        text = u' '.join(make_sentence(rng, special=0.4) for _ in range(rng.randint(1, 3)))
+        return text.replace(u' ', u'　', rng.randint(0, 2))
+    raise ValueError('unknown kind of text: %s' % kind)
+
+
+KINDS = ['short', 'long', 'inflect', 'special']
+
+
+def make_corpus(size, kinds=KINDS, seed=0):
+    """Generate a reproducible synthetic corpus: {kind: [text, ...]}."""
+
+    rng = random.Random(seed)
+    return {kind: [make_text(rng, kind) for _ in range(size)] for kind in kinds}
+
+
+# function for measuring Mecab.pos() with the given options on texts
+def measure(mecab, tagger, texts, options, repeat=1):
+    latencies = []
+    mecab_time = 0.0
+    for _ in range(repeat):
+        for text in texts:
+            tagger.elapsed = 0.0
+            t = time.perf_counter()
+            mecab.pos(text, **options)
+            latencies.append(time.perf_counter() - t)
+            mecab_time += tagger.elapsed
+
+    latencies.sort()
+    total = sum(latencies)
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    return {'calls': len(latencies), 'chars': sum(map(len, texts)) * repeat, 'total': total,
+            'mecab': mecab_time, 'python': total - mecab_time,
+            'calls_per_sec': len(latencies) / total if total else 0.0,
+            'p50': percentile(0.5), 'p90': percentile(0.9), 'p99': percentile(0.99), 'max': latencies[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput and latency benchmark of Mecab.pos() for every combination of its options.')
+    parser.add_argument('-d', '--dicpath', default='/usr/local/lib/mecab/dic/mecab-ko-dic', help='the path of the MeCab-ko dictionary')
+    parser.add_argument('-b', '--backend', choices=sorted(_mecab.BACKENDS), default='mecab-python3', help='the binding of MeCab-ko (default: mecab-python3)')
+    parser.add_argument('-n', '--size', type=int, default=1000, help='the number of texts of each kind (default: 1000)')
+    parser.add_argument('-k', '--kind', action='append', choices=KINDS, help='the kinds of texts (default: all)')
+    parser.add_argument('-r', '--repeat', type=int, default=1, help='the number of passes over the corpus (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the corpus generator (default: 0)')
+    parser.add_argument('--record', metavar='FILE', help='save the results of MeCab-ko for the corpus to FILE')
+    parser.add_argument('--replay', metavar='FILE', help='use the results in FILE instead of MeCab-ko')
+    parser.add_argument('--json', metavar='FILE', help='save the measurements to FILE')
+    args = parser.parse_args()
+
+    kinds = args.kind or KINDS
+    if args.replay:
+        backend = _mecab.ReplayBackend(args.replay).load()
+        args.size, kinds, args.seed = backend.metadata['size'], backend.metadata['kinds'], backend.metadata['seed']
+    elif args.record:
+        backend = _mecab.RecordBackend(args.record, backend=args.backend)
+    else:
+        backend = _mecab.get_backend(args.backend)
+    tagger = _mecab.TimedTagger(backend(args.dicpath))    # measuring the time in MeCab-ko
+    corpus = make_corpus(args.size, kinds, seed=args.seed)
+
+    measurements = []
+    print('%-8s %-8s %-7s %-5s %-4s %9s %9s %9s %9s %8s %8s' % ('kind', 'version', 'flatten', 'join', 'coda',
+                                                                'calls/s', 'p50(us)', 'p90(us)', 'p99(us)', 'mecab%', 'python%'))
+    for kind in kinds:
+        for use_original, flatten, join, coda_normalization in itertools.product((False, True), repeat=4):
+            if use_original and not coda_normalization:     # coda_normalization is only for the fixed version
+                continue
+            mecab = _mecab.Mecab(args.dicpath, use_original=use_original, lazy=True)
+            mecab.pool = _mecab.TaggerPool(None, taggers=[tagger])
+            options = {'flatten': flatten, 'join': join, 'coda_normalization': coda_normalization}
+            result = measure(mecab, tagger, corpus[kind], options, repeat=args.repeat)
+            result.update(kind=kind, use_original=use_original, **options)
+            measurements.append(result)
+            print('%-8s %-8s %-7s %-5s %-4s %9.0f %9.1f %9.1f %9.1f %7.1f%% %7.1f%%' % (
+                kind, 'original' if use_original else 'fixed', flatten, join, '-' if use_original else coda_normalization,
+                result['calls_per_sec'], result['p50'] * 1e6, result['p90'] * 1e6, result['p99'] * 1e6,
+                100 * result['mecab'] / result['total'], 100 * result['python'] / result['total']))
+
+    if args.record:
+        backend.save(size=args.size, kinds=kinds, seed=args.seed)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(measurements, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+# startup benchmark of _mecab.py: latency from the import of the module to the first result of Mecab.pos()
+# each run is measured in a fresh interpreter
+#
+# usage: python benchmarks/bench_startup.py [--dicpath DICPATH] [--repeat N]
+
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))     # the directory of _mecab.py
+
+CHILD = '''
+import sys, time, json
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+import _mecab
+t1 = time.perf_counter()
+mecab = _mecab.Mecab({dicpath!r}, lazy={lazy!r})
+t2 = time.perf_counter()
+mecab.pos({phrase!r})
+t3 = time.perf_counter()
+print(json.dumps([t1 - t0, t2 - t1, t3 - t2, t3 - t0]))
+'''
+
+
+def run(dicpath, lazy, phrase, repeat):
+    code = CHILD.format(root=ROOT, dicpath=dicpath, lazy=lazy, phrase=phrase)
+    timings = [json.loads(subprocess.check_output([sys.executable, '-c', code]).decode('utf-8')) for _ in range(repeat)]
+    return [sorted(column)[len(column) // 2] for column in zip(*timings)]   # medians
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup benchmark of _mecab.py (import to first result).')
+    parser.add_argument('-d', '--dicpath', default='/usr/local/lib/mecab/dic/mecab-ko-dic', help='the path of the MeCab-ko dictionary')
+    parser.add_argument('-n', '--repeat', type=int, default=10, help='the number of runs of each setting (default: 10)')
+    parser.add_argument('--phrase', default=u'너를 좋아해.', help='the phrase of the first result')
+    args = parser.parse_args()
+
+    print('%-10s %10s %10s %10s %10s' % ('', 'import', 'Mecab()', 'first pos', 'total'))
+    for lazy in (False, True):
+        timings = run(args.dicpath, lazy, args.phrase, args.repeat)
+        print('%-10s %s' % ('lazy' if lazy else 'eager', ' '.join('%8.1fms' % (t * 1000) for t in timings)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+# fixtures shared by the tests: a Mecab instance replaying the results of MeCab-ko recorded in data/replay.json
+# (_mecab.ReplayBackend), so that the tests run without MeCab-ko, mecab-ko-dic and KoNLPy
+# data/replay.json is recorded by _mecab.RecordBackend (with MeCab-ko and mecab-ko-dic), for its 'sentences'
+
+
+import json
+import os
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))     # the directory of _mecab.py
+sys.path.insert(0, ROOT)
+
+import _mecab
+
+
+REPLAY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'replay.json')
+
+with open(REPLAY_PATH, encoding='utf-8') as f:
+    SENTENCES = json.load(f)['sentences']   # the recorded sentences (for parametrizing tests)
+
+
+@pytest.fixture(scope='session')
+def mecab():
+    return _mecab.Mecab(backend=_mecab.ReplayBackend(REPLAY_PATH), lazy=True)
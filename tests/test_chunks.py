@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+# tests of split_chunks(), which splits a long phrase for Mecab.pos(max_chunk_chars=...)
+
+
+import random
+
+import pytest
+
+import _mecab
+
+
+def random_text(rng, size, max_eojeol):
+    words = []
+    while sum(map(len, words)) < size:
+        word = ''.join(rng.choice('가나다ab.!') for _ in range(rng.randint(1, max_eojeol)))
+        words.append(word + rng.choice([' ', ' ', ' ', '\n', '\t', '\r\n', '  ']))
+    return ''.join(words)
+
+
+@pytest.mark.parametrize('max_eojeol', [5, 30, 150])
+@pytest.mark.parametrize('max_chars', [1, 7, 100])
+def test_split_chunks(max_eojeol, max_chars):
+    rng = random.Random(max_eojeol * 1000 + max_chars)
+    for _ in range(20):
+        text = random_text(rng, 2000, max_eojeol)
+        chunks = list(_mecab.split_chunks(text, max_chars))
+
+        assert ''.join(chunks) == text
+        assert all(chunks)
+        for chunk, following in zip(chunks, chunks[1:]):
+            assert following[:1].isspace()  # no eojeol is split
+            if len(chunk) > max_chars:  # only an eojeol longer than max_chars is kept whole
+                assert len(chunk.split()) == 1
+
+
+def test_split_chunks_without_blanks():
+    assert list(_mecab.split_chunks('가' * 10, 3)) == ['가' * 10]
+    assert list(_mecab.split_chunks('가' * 10 + ' 나', 3)) == ['가' * 10, ' 나']
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+# round-trip tests of the binary corpus format: CorpusWriter writes the results of Mecab.pos(flatten=False),
+# and CorpusReader reads them back, from a file in the byte order of this machine and from one in the other byte order
+
+
+import array
+import json
+import sys
+
+import pytest
+
+import _mecab
+from conftest import SENTENCES
+
+
+DOCUMENTS = [SENTENCES[:5], SENTENCES[5:6], SENTENCES[6:]]  # documents of several sentences, and of a single one
+
+
+# function for converting a corpus file into the other byte order, as if it were written on such a machine
+def swap_byte_order(path):
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+
+    footer_position = int.from_bytes(data[len(_mecab.corpus_magic):len(_mecab.corpus_magic) + 8], 'little')
+    footer = json.loads(data[footer_position:].decode('utf-8'))
+    for name, (position, length, typecode) in footer['sections'].items():
+        column = array.array(typecode)
+        column.frombytes(bytes(data[position:position + length * column.itemsize]))
+        column.byteswap()
+        data[position:position + length * column.itemsize] = column.tobytes()
+    footer['byteorder'] = 'big' if sys.byteorder == 'little' else 'little'
+
+    with open(path, 'wb') as f:
+        f.write(bytes(data[:footer_position]) + json.dumps(footer, ensure_ascii=False).encode('utf-8'))
+
+
+@pytest.fixture(params=['native', 'swapped'])
+def corpus_path(request, mecab, tmp_path):
+    path = str(tmp_path / 'corpus.bin')
+    with _mecab.CorpusWriter(path) as writer:
+        for document in DOCUMENTS:
+            for phrase in document:
+                writer.add(mecab.pos(phrase, flatten=False))
+            writer.end_document()
+    if request.param == 'swapped':
+        swap_byte_order(path)
+    return path
+
+
+def test_sentences(mecab, corpus_path):
+    with _mecab.CorpusReader(corpus_path) as corpus:
+        assert len(corpus) == len(SENTENCES)
+        for i, phrase in enumerate(SENTENCES):
+            assert corpus.sentence(i) == mecab.pos(phrase, flatten=False)
+            assert corpus.sentence(i, flatten=True, join=True) == mecab.pos(phrase, join=True)
+        assert corpus[-1] == mecab.pos(SENTENCES[-1], flatten=False)
+        assert list(corpus) == [mecab.pos(phrase, flatten=False) for phrase in SENTENCES]
+
+
+def test_documents(mecab, corpus_path):
+    with _mecab.CorpusReader(corpus_path) as corpus:
+        assert corpus.document_count == len(DOCUMENTS)
+        for i, document in enumerate(DOCUMENTS):
+            assert corpus.document(i) == [mecab.pos(phrase, flatten=False) for phrase in document]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+# tests of the disk cache of Mecab.pos() (DiskCache) on the recorded results of MeCab-ko (see conftest.py)
+
+
+import itertools
+import json
+import pickle
+import sqlite3
+
+import _mecab
+from conftest import REPLAY_PATH, SENTENCES
+
+
+def test_pos(mecab, tmp_path):
+    path = str(tmp_path / 'pos.sqlite')
+    for flatten, join, coda_normalization in itertools.product((True, False), repeat=3):
+        options = dict(flatten=flatten, join=join, coda_normalization=coda_normalization)
+        expected = [mecab.pos(phrase, **options) for phrase in SENTENCES]
+
+        cached = _mecab.Mecab(backend=_mecab.ReplayBackend(REPLAY_PATH), lazy=True, disk_cache=path)
+        assert [cached.pos(phrase, **options) for phrase in SENTENCES] == expected    # stored
+        reopened = _mecab.Mecab(backend=_mecab.ReplayBackend(REPLAY_PATH), lazy=True, disk_cache=path)
+        assert [reopened.pos(phrase, **options) for phrase in SENTENCES] == expected  # loaded, with the tuples kept
+        assert reopened.pos_many(SENTENCES, **options) == expected
+        assert reopened.disk_cache_info().hits == 2 * len(SENTENCES)
+
+
+def test_values_are_not_unpickled(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = _mecab.DiskCache(path)
+    cache.put('ok', [('너', 'NP'), ('를', 'JKO')])
+
+    class Payload():
+        def __reduce__(self):
+            return (exec, ('raise AssertionError("unpickled")',))
+
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute('INSERT INTO results VALUES (?, ?, ?)', (cache.hash_key('evil'), '', pickle.dumps(Payload())))
+    connection.close()
+
+    assert cache.get_many(['ok', 'evil']) == [[('너', 'NP'), ('를', 'JKO')], None]  # a broken entry is a miss
+    assert cache.info().hits == 1
+
+
+def test_use_node(tmp_path):
+    # the string and the node paths group a misaligned result differently, so they must not share entries
+    replay_path = str(tmp_path / 'replay.json')
+    with open(replay_path, 'w', encoding='utf-8') as f:
+        json.dump({'results': {'가 나': '가\tNNG,*,F,가,*,*,*,*\n다\tNNG,*,F,다,*,*,*,*\n나\tNP,*,F,나,*,*,*,*\nEOS\n'}}, f, ensure_ascii=False)
+    path = str(tmp_path / 'pos.sqlite')
+
+    strings = _mecab.Mecab(backend=_mecab.ReplayBackend(replay_path), lazy=True, disk_cache=path)
+    nodes = _mecab.Mecab(backend=_mecab.ReplayBackend(replay_path), lazy=True, disk_cache=path, use_node=True)
+    assert strings.pos('가 나', flatten=False) == [[('가', 'NNG')], [('다', 'NNG'), ('나', 'NP')]]
+    assert nodes.pos('가 나', flatten=False) == [[('가', 'NNG'), ('다', 'NNG')], [('나', 'NP')]]
+    assert nodes.disk_cache_info().hits == 0
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+# tests of Mecab.pos_filter() and MorphemeFilter on the recorded results of MeCab-ko (see conftest.py)
+
+
+import fnmatch
+
+import pytest
+
+import _mecab
+from conftest import SENTENCES
+
+
+@pytest.mark.parametrize('include_tags, exclude_tags, stopwords, min_len', [
+    (None, None, None, 0),
+    ('N*', None, None, 0),
+    (['NN*', 'VV', 'VA', 'XR'], None, ['것'], 2),
+    (None, ['S*', 'J*'], None, 0),
+    (['N*'], ['NP'], None, 0),
+    (None, [], [], 0),
+])
+@pytest.mark.parametrize('join', [False, True])
+def test_pos_filter(mecab, include_tags, exclude_tags, stopwords, min_len, join):
+    include = [include_tags] if isinstance(include_tags, str) else include_tags
+
+    def accepted(morpheme, tag):
+        return ((include is None or any(fnmatch.fnmatchcase(tag, p) for p in include))
+                and not any(fnmatch.fnmatchcase(tag, p) for p in exclude_tags or ())
+                and morpheme not in (stopwords or ()) and len(morpheme) >= min_len)
+
+    for phrase in SENTENCES:
+        expected = [x for x in mecab.pos(phrase) if accepted(*x)]
+        if join:
+            expected = [morpheme + '/' + tag for morpheme, tag in expected]
+        assert mecab.pos_filter(phrase, include_tags=include_tags, exclude_tags=exclude_tags, stopwords=stopwords, min_len=min_len, join=join) == expected
+
+
+def test_empty_include_tags(mecab):
+    assert not _mecab.MorphemeFilter(include_tags=[])('너', 'NP')
+    for phrase in SENTENCES:
+        assert mecab.pos_filter(phrase, include_tags=[]) == []
+        assert mecab.pos_filter(phrase, exclude_tags=[]) == mecab.pos(phrase)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# tests of IncrementalAnalyzer (and SentenceBlocks, FenwickTree) on the recorded results of MeCab-ko (see conftest.py)
+# random edits are applied to a text of recorded sentences, one per line, and the result is compared with a fresh pos()
+# of each sentence of the edited text. The edits cut the text at any character, but always leave recorded sentences
+
+
+import itertools
+import random
+
+import pytest
+
+import _mecab
+from conftest import SENTENCES
+
+
+# function for splitting a text into its sentences in the same way as IncrementalAnalyzer
+def split_text(text):
+    offsets = _mecab.split_sentences(text)
+    return [(start, end) for start, end in zip(offsets, offsets[1:] + [len(text)])]
+
+
+# the recorded sentences which split_sentences() keeps whole between newlines
+LINES = [s for s in SENTENCES if [(s + '\n' + s)[start:end] for start, end in split_text(s + '\n' + s)] == [s, '\n', s]]
+
+
+# function for getting the expected eojeols and sentences of IncrementalAnalyzer from a fresh pos() of each sentence
+def expected_sentences(mecab, text, join, coda_normalization):
+    return [(start, end, mecab.pos(text[start:end], flatten=False, join=join, coda_normalization=coda_normalization)) for start, end in split_text(text)]
+
+
+# function for a random edit of the list of lines: inserting, deleting or replacing some of them
+def edit_lines(rng, lines):
+    lines = list(lines)
+    start = rng.randint(0, len(lines))
+    stop = rng.randint(start, min(len(lines), start + rng.choice([1, 2, 8 if len(lines) < 60 else 30])))
+    lines[start:stop] = [rng.choice(LINES) for _ in range(rng.choice([0, 1, 1, 2, 5, 20]))]
+    return lines
+
+
+@pytest.mark.parametrize('block_size', [2, 3, 64])
+@pytest.mark.parametrize('join, coda_normalization', [(False, True), (True, False)])
+def test_random_edits(mecab, monkeypatch, block_size, join, coda_normalization):
+    monkeypatch.setattr(_mecab.SentenceBlocks, 'block_size', block_size)
+    rng = random.Random(block_size)
+
+    lines = [rng.choice(LINES) for _ in range(30)]
+    text = '\n'.join(lines)
+    analyzer = _mecab.IncrementalAnalyzer(mecab, text, join=join, coda_normalization=coda_normalization)
+    eojeols = analyzer.eojeols()
+    assert analyzer.sentences() == expected_sentences(mecab, text, join, coda_normalization)
+
+    for step in range(150):
+        lines = edit_lines(rng, lines)
+        new_text = '\n'.join(lines)
+
+        if step % 2:
+            splice = analyzer.update(new_text)
+        else:   # an edit of a range around the changed part, cut at any character
+            prefix, suffix = _mecab.common_affix_lengths(text, new_text)
+            tail = rng.randint(0, suffix)
+            start = rng.randint(0, min(prefix, len(text) - tail, len(new_text) - tail))
+            splice = analyzer.edit(start, len(text) - tail, new_text[start:len(new_text) - tail])
+        text = new_text
+
+        expected = expected_sentences(mecab, text, join, coda_normalization)
+        eojeols[splice.start:splice.stop] = splice.eojeols   # the splice turns the old eojeols into the new ones
+        assert eojeols == list(itertools.chain.from_iterable(result for start, end, result in expected))
+        assert analyzer.eojeols() == eojeols
+        assert analyzer.sentences() == expected
+        assert analyzer.text == text
+
+
+def test_invalid_edit(mecab):
+    analyzer = _mecab.IncrementalAnalyzer(mecab, LINES[0])
+    with pytest.raises(Exception):
+        analyzer.edit(0, len(LINES[0]) + 1, '')
+    with pytest.raises(Exception):
+        analyzer.edit(2, 1, '')
+
+
+def test_empty_text(mecab):
+    analyzer = _mecab.IncrementalAnalyzer(mecab, '')
+    assert analyzer.eojeols() == []
+
+    text = '\n'.join(LINES[:3])
+    splice = analyzer.update(text)
+    assert splice.eojeols == analyzer.eojeols() == list(itertools.chain.from_iterable(result for start, end, result in expected_sentences(mecab, text, False, True)))
+
+    count = len(analyzer.eojeols())
+    assert analyzer.edit(0, len(text), '') == _mecab.Splice(0, count, [])
+    assert analyzer.eojeols() == [] and analyzer.text == ''
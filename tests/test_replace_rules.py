@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# tests of ReplaceRules, the replacements of a phrase before the analysis (Mecab.replace_rules)
+
+
+import random
+
+import pytest
+
+import _mecab
+from conftest import REPLAY_PATH, SENTENCES
+
+
+DEFAULT_RULES = [('\u3000', ' '), ('영치기 영차', '영치기영차')]   # Mecab.replace_list of the fixed version
+
+
+def test_default_rules(mecab):
+    assert mecab.replace_list == DEFAULT_RULES
+    assert _mecab.Mecab(backend=_mecab.ReplayBackend(REPLAY_PATH), lazy=True, use_original=True).replace_list == DEFAULT_RULES[1:]
+
+
+@pytest.mark.parametrize('rules', [DEFAULT_RULES, DEFAULT_RULES[1:]])
+def test_same_as_replace_multiple(rules):
+    replace_rules = _mecab.ReplaceRules(rules)
+    rng = random.Random(len(rules))
+    pieces = ['영치기', '영차', ' ', '\u3000', '영', '치기', '!', '\n']
+    texts = SENTENCES + ['영치기 영차', '영치기\u3000영차', '영치기\u3000\u3000영차', '영치기  영차', '영치기 영치기 영차 영차', '']
+    texts += [''.join(rng.choice(pieces) for _ in range(rng.randint(1, 30))) for _ in range(2000)]
+
+    for text in texts:
+        assert replace_rules.replace(text) == _mecab.replace_multiple(text, rules)
+
+
+def test_overlapping_rules():
+    # the longest match is taken, whatever the order of the rules (replace_multiple() would apply ('ab', 'X') first)
+    assert _mecab.ReplaceRules([('ab', 'X'), ('abc', 'Y')]).replace('abc') == 'Y'
+    assert _mecab.ReplaceRules([('abc', 'Y'), ('ab', 'X')]).replace('abc') == 'Y'
+    assert _mecab.ReplaceRules([('ab', 'X'), ('abc', 'Y')]).replace('abd') == 'Xd'
+    assert _mecab.replace_multiple('abc', [('ab', 'X'), ('abc', 'Y')]) == 'Xc'
+
+    # only the first rule for a string is applied
+    assert _mecab.ReplaceRules([('ab', 'X'), ('ab', 'Y')]).replace('ab') == 'X'
+
+
+def test_chained_rules():
+    # a replacement is not replaced again by the later rules
+    assert _mecab.ReplaceRules([('a', 'b'), ('b', 'c')]).replace('ab') == 'bc'
+    assert _mecab.replace_multiple('ab', [('a', 'b'), ('b', 'c')]) == 'cc'
+
+    # except a single character replaced into one, inside the longer rules after it
+    assert _mecab.ReplaceRules([('\u3000', ' '), ('영치기 영차', '영치기영차')]).replace('영치기\u3000영차') == '영치기영차'
+    assert _mecab.ReplaceRules([('영치기 영차', '영치기영차'), ('\u3000', ' ')]).replace('영치기\u3000영차') == '영치기 영차'
+
+
+def test_replace_offsets():
+    rules = _mecab.ReplaceRules(DEFAULT_RULES + [('ab', 'X'), ('abc', 'Y')])
+    assert rules.replace_offsets('영치기 영차!') == ('영치기영차!', [0, 1, 2, 4, 5, 6, 7])
+
+    rng = random.Random(0)
+    for _ in range(500):
+        text = ''.join(rng.choice(['영치기', '영차', ' ', '\u3000', 'a', 'b', 'c', 'd']) for _ in range(rng.randint(0, 20)))
+        replaced, origin = rules.replace_offsets(text)
+        assert replaced == rules.replace(text)
+        assert len(origin) == len(replaced) + 1 and origin[-1] == len(text)
+        assert origin == sorted(origin) and all(0 <= i <= len(text) for i in origin)
+
+
+def test_empty_rule():
+    with pytest.raises(Exception):
+        _mecab.ReplaceRules([('', 'X')])
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / 'rules.tsv'
+    path.write_text('# comment\nab\tX\n\nabc\tY\n', encoding='utf-8')
+    rules = _mecab.ReplaceRules.from_file(str(path))
+    assert rules.rules == [('ab', 'X'), ('abc', 'Y')]
+    assert rules.replace('abc abd') == 'Y Xd'
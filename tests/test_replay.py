@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# regression tests of Mecab.pos(), morphs() and nouns() on the recorded results of MeCab-ko (see conftest.py)
+# the results are compared with the straightforward version: parse_fixed(hangul_unicode_correction(result)) and the coda normalization
+#
+# usage: python -m pytest tests
+
+
+import itertools
+
+import pytest
+
+import _mecab
+from conftest import REPLAY_PATH, SENTENCES
+
+
+# function for getting the expected result of Mecab.pos() (flatten=True) from an analysed result of MeCab-ko
+def expected_pos(result, join=False, coda_normalization=True):
+    result = _mecab.hangul_unicode_correction(parsed=result)
+    if coda_normalization:
+        result = _mecab.replace_multiple(string=result, replace_list=[("ᆫ", "ㄴ"), ("ᆯ", "ㄹ"), ("ᄆ", "ㅁ"), ("ᄇ", "ㅂ"), ("ᆼ", "ㅇ")])
+    return _mecab.parse_fixed(result, join=join)
+
+
+@pytest.mark.parametrize('flatten, join, coda_normalization', list(itertools.product((True, False), repeat=3)))
+@pytest.mark.parametrize('sentence', SENTENCES)
+def test_pos(mecab, sentence, flatten, join, coda_normalization):
+    phrase, result = mecab.parse_raw(sentence)
+    expected = expected_pos(result, join=join, coda_normalization=coda_normalization)
+
+    pos_result = mecab.pos(sentence, flatten=flatten, join=join, coda_normalization=coda_normalization)
+
+    if flatten:
+        assert pos_result == expected
+    else:   # the same morphemes, grouped by the eojeols of the phrase
+        assert list(itertools.chain.from_iterable(pos_result)) == expected
+        assert len(pos_result) == len(phrase.split())
+
+
+@pytest.mark.parametrize('sentence', SENTENCES)
+def test_morphs(mecab, sentence):
+    phrase, result = mecab.parse_raw(sentence)
+
+    assert mecab.morphs(sentence) == [morpheme for morpheme, tag in expected_pos(result)]
+
+
+@pytest.mark.parametrize('sentence', SENTENCES)
+def test_nouns(mecab, sentence):
+    phrase, result = mecab.parse_raw(sentence)
+
+    assert mecab.nouns(sentence) == [morpheme for morpheme, tag in expected_pos(result) if tag.startswith('N')]
+
+
+@pytest.fixture(scope='module')
+def node_mecab():
+    return _mecab.Mecab(backend=_mecab.ReplayBackend(REPLAY_PATH), lazy=True, use_node=True)
+
+
+@pytest.mark.parametrize('flatten, join, coda_normalization', list(itertools.product((True, False), repeat=3)))
+def test_pos_node(mecab, node_mecab, flatten, join, coda_normalization):
+    # the nodes rebuilt from the recorded results give the same results as the analysed strings
+    for sentence in SENTENCES:
+        options = dict(flatten=flatten, join=join, coda_normalization=coda_normalization)
+        assert node_mecab.pos(sentence, **options) == mecab.pos(sentence, **options)
+
+
+def test_record_node(mecab, tmp_path):
+    # RecordBackend records the analysed strings of use_node=True as well
+    recorded = str(tmp_path / 'recorded.json')
+    backend = _mecab.RecordBackend(recorded, backend=_mecab.ReplayBackend(REPLAY_PATH))
+    recorder = _mecab.Mecab(backend=backend, lazy=True, use_node=True)
+    expected = [recorder.pos(sentence, flatten=False) for sentence in SENTENCES]
+    backend.save()
+
+    replayed = _mecab.Mecab(backend=_mecab.ReplayBackend(recorded), lazy=True, use_node=True)
+    assert [replayed.pos(sentence, flatten=False) for sentence in SENTENCES] == expected == [mecab.pos(sentence, flatten=False) for sentence in SENTENCES]
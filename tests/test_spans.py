@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+# tests of Mecab.pos_spans() on the recorded results of MeCab-ko (see conftest.py)
+
+
+import itertools
+import json
+
+import pytest
+
+import _mecab
+from conftest import SENTENCES
+
+
+@pytest.mark.parametrize('flatten, join, coda_normalization', list(itertools.product((True, False), repeat=3)))
+def test_same_as_pos(mecab, flatten, join, coda_normalization):
+    for phrase in SENTENCES:
+        pos_result, spans, eojeol_spans = mecab.pos_spans(phrase, flatten=flatten, join=join, coda_normalization=coda_normalization)
+
+        assert pos_result == mecab.pos(phrase, flatten=flatten, join=join, coda_normalization=coda_normalization)
+        if flatten:
+            assert len(spans) == len(pos_result)
+        else:
+            assert [len(ej_span) for ej_span in spans] == [len(ej_mor) for ej_mor in pos_result]
+            assert len(eojeol_spans) == len(pos_result)
+
+
+def test_spans(mecab):
+    for phrase in SENTENCES:
+        pos_result, spans, eojeol_spans = mecab.pos_spans(phrase, flatten=False, coda_normalization=False)
+
+        # the eojeols of the phrase, and the surfaces of the morphemes which are not decomposed
+        assert [phrase[start:end] for start, end in eojeol_spans] == phrase.split()
+        for ej_mor, ej_span, (ej_start, ej_end) in zip(pos_result, spans, eojeol_spans):
+            for (morpheme, tag), (start, end) in zip(ej_mor, ej_span):
+                assert ej_start <= start < end <= ej_end
+                if list(ej_span).count((start, end)) == 1:
+                    assert phrase[start:end] == morpheme
+
+
+def test_replaced_phrase(mecab):
+    # the spans are in the phrase before the replacements (e.g. '　' > ' ')
+    phrase = '예쁜　꽃이 피었습니다.'
+    pos_result, spans, eojeol_spans = mecab.pos_spans(phrase, flatten=False)
+    assert [phrase[start:end] for start, end in eojeol_spans] == ['예쁜', '꽃이', '피었습니다.']
+
+
+def test_surfaces_not_found(tmp_path):
+    # an unanalyzable character (an empty line) and a surface which is not in the phrase get None, not an empty span
+    path = str(tmp_path / 'replay.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'results': {'가 나': '가\tNNG,*,F,가,*,*,*,*\n\n다\tNNG,*,F,다,*,*,*,*\nEOS\n'}}, f, ensure_ascii=False)
+    mecab = _mecab.Mecab(backend=_mecab.ReplayBackend(path), lazy=True)
+
+    pos_result, spans, eojeol_spans = mecab.pos_spans('가 나', flatten=False)
+    assert pos_result == mecab.pos('가 나', flatten=False) == [[('가', 'NNG')], [('', 'SY'), ('다', 'NNG')]]
+    assert spans == [[(0, 1)], [None, None]]
+    assert eojeol_spans == [(0, 1), None]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# tests of the instrumentation of Mecab.pos() (instrument=True, stats()) on the recorded results of MeCab-ko (see conftest.py)
+
+
+import json
+
+import _mecab
+from conftest import REPLAY_PATH, SENTENCES
+
+
+# function for counting the Inflect tokens decomposed into several morphemes in an analysed result
+def count_decomposed(result):
+    count = 0
+    for elem in result.splitlines()[:-1]:
+        if elem:
+            attrs = elem.split('\t')[1].split(',')
+            if attrs[4].startswith('Inflect') and '+' in attrs[-1]:
+                count += 1
+    return count
+
+
+def test_stats(mecab):
+    hooked = []
+    instrumented = _mecab.Mecab(backend=_mecab.ReplayBackend(REPLAY_PATH), lazy=True, instrument=True, stats_hook=hooked.append)
+    for phrase in SENTENCES:
+        assert instrumented.pos(phrase) == mecab.pos(phrase)
+        assert instrumented.pos(phrase, flatten=False) == mecab.pos(phrase, flatten=False)
+
+    stats = instrumented.stats()
+    assert stats['calls'] == len(hooked) == 2 * len(SENTENCES)
+    assert stats['inflects'] == 2 * sum(count_decomposed(mecab.parse_raw(phrase)[1]) for phrase in SENTENCES) > 0
+    assert set(stats['stages']) == {'preprocess', 'wait', 'tagger', 'postprocess', 'postprocess_eojeol', 'total'}
+    assert len(stats['slowest']) == 10
+
+    instrumented.reset_stats()
+    assert instrumented.stats()['calls'] == 0
+    assert mecab.stats() is None
+
+
+def test_inflects_of_single_morpheme(tmp_path):
+    # an Inflect token with a single morpheme is not decomposed, so it is not counted
+    path = str(tmp_path / 'replay.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'results': {'가 해': '가\tVV,*,F,가,Inflect,VV,VV,가/VV/*\n해\tVV+EF,*,F,해,Inflect,VV,EF,하/VV/*+아/EF/*\nEOS\n'}}, f, ensure_ascii=False)
+    instrumented = _mecab.Mecab(backend=_mecab.ReplayBackend(path), lazy=True, instrument=True)
+
+    assert instrumented.pos('가 해') == [('가', 'VV'), ('하', 'VV'), ('아', 'EF')]
+    assert instrumented.stats()['inflects'] == 1
+
+
+def test_inflects_of_nodes(mecab):
+    instrumented = _mecab.Mecab(backend=_mecab.ReplayBackend(REPLAY_PATH), lazy=True, instrument=True, use_node=True)
+    for phrase in SENTENCES:
+        instrumented.pos(phrase)
+    assert instrumented.stats()['inflects'] == sum(count_decomposed(mecab.parse_raw(phrase)[1]) for phrase in SENTENCES)